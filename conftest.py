@@ -0,0 +1 @@
+"""Lets the tests under tests/ import the flat org_* modules from the repo root."""
@@ -0,0 +1,246 @@
+"""Cost a batch of scenarios from the command line.
+
+Reads scenarios from a CSV file (one per row) or a TOML file of
+``[[scenario]]`` and ``[[grid]]`` tables, costs them across a process pool
+and streams one row per scenario to CSV or Parquet, in input order.
+
+    python org_batch.py planning.toml --output variants.csv
+    python org_batch.py planning.csv --output variants.parquet --workers 8
+
+Scenario keys are all optional and default to the app's initial slider
+values: ``name``, ``staff_scale``, ``seniority``, ``workers_per_mgr``,
+``content_team``, ``uplift_pct`` (default: the structure's own) and
+``structure`` (a file name in ``pay_structures/`` or a path). In a grid
+each key is a single value, a list, or ``{first = .., last = .., step = ..}``,
+and the grid expands to every combination.
+
+``staff_scale`` and ``seniority`` must lie within the app's slider ranges;
+``workers_per_mgr`` may go beyond its slider but must be at least 1.
+"""
+import argparse
+import csv
+import itertools
+import math
+import os
+import sys
+import tomllib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from org_model import (
+    DEFAULT_PAY_STRUCTURE, PAY_STRUCTURE_DIR, SENIORITY_RANGE, STAFF_SCALE_RANGE, TEAMS, cached_org, pay_config,
+    pay_structure,
+)
+
+DEFAULTS = {"name": "", "staff_scale": 100, "seniority": 100, "workers_per_mgr": 10, "content_team": False,
+            "uplift_pct": None, "structure": None}
+LEVELS = (2, 3, 4, 5, 6)
+OUTPUT_FIELDS = (
+    ["name", "staff_scale", "seniority", "workers_per_mgr", "content_team", "structure", "uplift_pct",
+     "headcount", "total_cost"]
+    + [f"{team.split('_')[1].lower()}_cost" for team in TEAMS]
+    + [f"level_{level}" for level in LEVELS]
+)
+CHUNK_SIZE = 64
+
+
+def _flag(value):
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value not in ("true", "false", "yes", "no", "1", "0", ""):
+            raise ValueError(f"not a yes/no value: {value!r}")
+        return value in ("true", "yes", "1")
+    return bool(value)
+
+
+def normalize_scenario(raw, number=None):
+    """Scenario dict with defaults filled in and values coerced and range-checked.
+
+    Raises ValueError on unknown keys or bad values or types, naming
+    scenario ``number`` (1-based, in input order) when given.
+    """
+    try:
+        unknown = set(raw) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f"unknown scenario keys: {', '.join(sorted(unknown))}")
+        scenario = dict(DEFAULTS)
+        scenario.update({key: value for key, value in raw.items() if value not in (None, "")})
+        for key in ("staff_scale", "seniority", "workers_per_mgr"):
+            scenario[key] = int(scenario[key])
+        for key, (low, high) in (("staff_scale", STAFF_SCALE_RANGE), ("seniority", SENIORITY_RANGE)):
+            if not low <= scenario[key] <= high:
+                raise ValueError(f"{key} {scenario[key]} is outside {low}-{high}")
+        if scenario["workers_per_mgr"] < 1:
+            raise ValueError(f"workers_per_mgr must be at least 1, not {scenario['workers_per_mgr']}")
+        scenario["content_team"] = _flag(scenario["content_team"])
+        if scenario["uplift_pct"] is not None:
+            scenario["uplift_pct"] = float(scenario["uplift_pct"])
+            if not math.isfinite(scenario["uplift_pct"]):
+                raise ValueError(f"uplift_pct must be finite, not {scenario['uplift_pct']}")
+        scenario["name"] = str(scenario["name"])
+    except (TypeError, ValueError) as e:
+        # TOML can hand over lists and tables where numbers belong
+        if number is None:
+            raise ValueError(str(e)) from e
+        name = raw.get("name") or ""
+        raise ValueError(f"scenario {number}{f' ({name})' if name else ''}: {e}") from e
+    return scenario
+
+
+def _grid_values(value):
+    if isinstance(value, dict):
+        return list(range(value["first"], value["last"] + 1, value.get("step", 1)))
+    return value if isinstance(value, list) else [value]
+
+
+def expand_grid(grid):
+    keys = list(grid)
+    for values in itertools.product(*(_grid_values(grid[key]) for key in keys)):
+        yield dict(zip(keys, values))
+
+
+def read_scenarios(path):
+    """Raw scenario dicts from a CSV or TOML file, lazily for grids."""
+    path = Path(path)
+    if path.suffix.lower() == ".toml":
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+        yield from data.get("scenario", [])
+        for grid in data.get("grid", []):
+            yield from expand_grid(grid)
+    else:
+        with open(path, newline="") as f:
+            yield from csv.DictReader(f)
+
+
+def _structure_path(structure):
+    if structure is None:
+        return DEFAULT_PAY_STRUCTURE
+    path = Path(structure)
+    if not path.exists() and (PAY_STRUCTURE_DIR / f"{structure}.toml").exists():
+        path = PAY_STRUCTURE_DIR / f"{structure}.toml"
+    return path
+
+
+def cost_scenario(scenario):
+    """One output row for a normalized scenario."""
+    path = _structure_path(scenario["structure"])
+    uplift_pct = pay_config(path).uplift_pct if scenario["uplift_pct"] is None else scenario["uplift_pct"]
+    pay = pay_structure(uplift_pct, path=path)
+    model = cached_org(scenario["staff_scale"], scenario["seniority"], scenario["workers_per_mgr"],
+                       scenario["content_team"], pay=pay)
+    team_cost = dict.fromkeys(TEAMS, 0)
+    level_count = dict.fromkeys(LEVELS, 0)
+    for post in model.leaders:
+        team_cost[post.team] += post.salary
+        level_count[post.level] += 1
+    for team in model.teams:
+        team_cost[team.team] += team.cost
+        for level, n, _, _ in team.levels:
+            level_count[level] += n
+    row = {key: scenario[key] for key in ("name", "staff_scale", "seniority", "workers_per_mgr", "content_team")}
+    row["structure"] = path.stem
+    row["uplift_pct"] = uplift_pct
+    row["headcount"] = model.headcount
+    row["total_cost"] = model.total_cost
+    row.update({f"{team.split('_')[1].lower()}_cost": cost for team, cost in team_cost.items()})
+    row.update({f"level_{level}": n for level, n in level_count.items()})
+    return row
+
+
+def cost_chunk(scenarios):
+    return [cost_scenario(scenario) for scenario in scenarios]
+
+
+def _chunks(iterable, size):
+    it = iter(iterable)
+    while chunk := list(itertools.islice(it, size)):
+        yield chunk
+
+
+def run(scenarios, workers=None, chunk_size=CHUNK_SIZE):
+    """Yield lists of output rows, in input order, costed across ``workers`` processes.
+
+    At most a few chunks per worker are in flight, so arbitrarily large
+    grids stream through in constant memory. ``workers=1`` stays in-process.
+    """
+    chunks = _chunks((normalize_scenario(raw, number) for number, raw in enumerate(scenarios, 1)), chunk_size)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(cost_chunk, chunks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(cost_chunk, chunk))
+            if len(pending) >= workers * 4:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class CsvSink:
+    def __init__(self, path):
+        self._file = sys.stdout if path == "-" else open(path, "w", newline="")
+        self._writer = csv.DictWriter(self._file, OUTPUT_FIELDS)
+        self._writer.writeheader()
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        if self._file is not sys.stdout:
+            self._file.close()
+
+
+class ParquetSink:
+    """Writes each chunk as a row group; needs pyarrow."""
+
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        types = {"name": pa.string(), "structure": pa.string(), "content_team": pa.bool_(), "uplift_pct": pa.float64()}
+        self._schema = pa.schema([(field, types.get(field, pa.int64())) for field in OUTPUT_FIELDS])
+        self._pa = pa
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, rows):
+        self._writer.write_table(self._pa.Table.from_pylist(rows, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+def open_sink(path):
+    return ParquetSink(path) if str(path).lower().endswith(".parquet") else CsvSink(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenarios", help="CSV or TOML file of scenarios")
+    parser.add_argument("--output", default="-", help="CSV or .parquet file to write (default: CSV to stdout)")
+    parser.add_argument("--workers", type=int, help="processes to cost with (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    try:
+        sink = open_sink(args.output)
+    except ImportError:
+        sys.exit("writing Parquet needs pyarrow; install it or write CSV instead")
+    count = 0
+    try:
+        for rows in run(read_scenarios(args.scenarios), args.workers, args.chunk_size):
+            sink.write(rows)
+            count += len(rows)
+    except (OSError, KeyError, ValueError) as e:
+        sys.exit(f"{args.scenarios}: {e}")
+    finally:
+        sink.close()
+    print(f"{count} scenarios costed", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
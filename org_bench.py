@@ -0,0 +1,136 @@
+"""Benchmark each stage of the app's pipeline on generated orgs of increasing size.
+
+Times team counting, the worker grade mix optimizer, the hierarchy build, per-post
+materialization, DOT emission, graphviz layout per engine and the listing
+table, and writes the timings to JSON. Pass an earlier run with
+``--compare`` to see per-stage ratios between two versions of the code.
+
+    python org_bench.py --output bench.json
+    python org_bench.py --compare bench.json --no-layout
+"""
+import argparse
+import json
+import math
+import platform
+import subprocess
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+from org_bench_engines import SHAPES, generated_org, time_layout
+from org_chart import LAYOUT_ENGINES, emit_dot
+from org_model import (
+    WORKER_LEVELS, PostStore, build_org, min_senior_share, optimal_mix, pay_structure, seniority_from_input,
+    staff_scale_from_input, team_counts,
+)
+
+SIZES = (30, 300, 3000, 30000)
+
+
+def best_time(fn, repeat):
+    """Best per-call time of ``fn`` over ``repeat`` runs, looping fast calls to at least 0.2s."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def stage_timings(headcount, workers_per_mgr, repeat):
+    """(stage, seconds) for every in-process stage, with every cache bypassed."""
+    model = generated_org(headcount, workers_per_mgr)
+    counts = model.counts
+    seniority = seniority_from_input(100)
+    salaries = tuple(pay_structure().salary(level, seniority)[0] for level in WORKER_LEVELS)
+    share = min_senior_share(seniority)
+    store = PostStore.from_model(model)
+
+    stages = {
+        "team_counts": lambda: team_counts(staff_scale_from_input(100), workers_per_mgr, False),
+        "allocation": lambda: [optimal_mix.__wrapped__(n, salaries, math.ceil(n * share), workers_per_mgr)
+                               for n in (counts.fss_num_staff, counts.system_num_staff, counts.content_num_staff)],
+        "hierarchy": lambda: build_org(100, 100, workers_per_mgr, False, counts=counts),
+        "posts": lambda: tuple(model.iter_posts()),
+        "dot": lambda: emit_dot(model, collapsed=False),
+        "dot_collapsed": lambda: emit_dot(model, collapsed=True),
+        "table_store": lambda: PostStore.from_model(model),
+        "table_order": lambda: PostStore.listing_order.func(store),
+        "table_frame": lambda: store.frame(store.listing_order),
+    }
+    return model, [(stage, best_time(fn, repeat)) for stage, fn in stages.items()]
+
+
+def run(sizes, workers_per_mgr, engines, repeat, budget):
+    results = []
+    over_budget = set()
+    for size in sizes:
+        model, timings = stage_timings(size, workers_per_mgr, repeat)
+        if engines:
+            chart = emit_dot(model, collapsed=False)
+            for engine in engines:
+                if engine in over_budget:
+                    continue
+                seconds = time_layout(chart.source, engine, repeat)
+                timings.append((f"layout_{engine}", seconds))
+                # Larger charts would only take longer
+                if seconds > budget:
+                    over_budget.add(engine)
+        for stage, seconds in timings:
+            results.append({"size": size, "posts": model.headcount, "stage": stage, "seconds": seconds})
+            print(f"{size:>6} {model.headcount:>6} posts  {stage:>15}  {seconds * 1e3:10.3f} ms", flush=True)
+    return results
+
+
+def compare(results, baseline):
+    """Print per-stage time ratios against an earlier run (>1 is slower now)."""
+    before = {(r["size"], r["stage"]): r["seconds"] for r in baseline["results"]}
+    print(f"\n{'size':>6} {'stage':>15} {'before ms':>10} {'now ms':>10} {'ratio':>7}")
+    for r in results:
+        old = before.get((r["size"], r["stage"]))
+        if old:
+            print(f"{r['size']:>6} {r['stage']:>15} {old * 1e3:10.3f} {r['seconds'] * 1e3:10.3f} {r['seconds'] / old:7.2f}")
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="approximate worker counts")
+    parser.add_argument("--shape", choices=SHAPES, default="wide", help="span of control of the generated orgs")
+    parser.add_argument("--engines", nargs="+", default=list(LAYOUT_ENGINES))
+    parser.add_argument("--no-layout", action="store_true", help="skip the graphviz layout stages")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=30.0,
+                        help="skip larger charts for an engine once a layout takes this long (s)")
+    parser.add_argument("--output", help="write the timings to this JSON file")
+    parser.add_argument("--compare", help="earlier JSON output to compare against")
+    args = parser.parse_args(argv)
+
+    engines = [] if args.no_layout else args.engines
+    if engines:
+        import graphviz
+
+        try:
+            graphviz.version()
+        except graphviz.ExecutableNotFound:
+            print("graphviz binaries not found; skipping the layout stages", file=sys.stderr)
+            engines = []
+
+    results = run(args.sizes, SHAPES[args.shape], engines, args.repeat, args.budget)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"revision": git_revision(), "python": platform.python_version(), "numpy": np.__version__,
+                       "shape": args.shape, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark graphviz layout engines on generated org charts.
+
+Lays out charts of increasing size and span of control with each engine
+and reports the time taken, plus the largest chart each engine handled
+within the target latency. Those limits are what ``org_chart.ENGINE_LIMITS``
+is tuned from; set ``ORG_ENGINE_BENCH`` to the ``--output`` file to have the
+app use them directly.
+
+    python org_bench_engines.py --sizes 30 100 300 1000 --output engines.json
+"""
+import argparse
+import json
+import sys
+import time
+
+from org_chart import LAYOUT_ENGINES, emit_dot
+from org_model import TeamCounts, build_org
+
+# Span of control for each generated shape
+SHAPES = {"narrow": 5, "wide": 10, "flat": 25}
+
+
+def generated_org(headcount, workers_per_mgr):
+    """An org of roughly ``headcount`` workers split like the slider model (60/30/10)."""
+    content = max(1, headcount // 10)
+    systems = max(1, headcount * 3 // 10)
+    fss = max(1, headcount - systems - content)
+    managers = max(1, round((fss + content) / workers_per_mgr))
+    counts = TeamCounts(fss, systems, content, managers)
+    return build_org(100, 100, workers_per_mgr, False, counts=counts)
+
+
+def time_layout(source, engine, repeat):
+    import graphviz
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        graphviz.Source(source, engine=engine).pipe(format="svg")
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(sizes, shapes, engines, repeat, budget):
+    results = []
+    # Once an engine blows the budget it is skipped for larger charts of that shape
+    over_budget = set()
+    for shape in shapes:
+        for size in sizes:
+            chart = emit_dot(generated_org(size, SHAPES[shape]), collapsed=False)
+            for engine in engines:
+                if (shape, engine) in over_budget:
+                    continue
+                seconds = time_layout(chart.source, engine, repeat)
+                results.append({"shape": shape, "size": size, "nodes": chart.nodes, "edges": chart.edges,
+                                "engine": engine, "seconds": seconds})
+                print(f"{shape:>7} {size:>6} posts  {chart.nodes:>6} nodes  {engine:>6}  {seconds:8.3f}s", flush=True)
+                if seconds > budget:
+                    over_budget.add((shape, engine))
+    return results
+
+
+def engine_limits(results, target):
+    """Largest nodes + edges each engine laid out within ``target`` seconds, for every shape."""
+    limits = {}
+    for engine in {r["engine"] for r in results}:
+        runs = [r for r in results if r["engine"] == engine]
+        slow = [r["nodes"] + r["edges"] for r in runs if r["seconds"] > target]
+        fast = [r["nodes"] + r["edges"] for r in runs if r["seconds"] <= target
+                and (not slow or r["nodes"] + r["edges"] < min(slow))]
+        limits[engine] = max(fast, default=0)
+    return limits
+
+
+def main(argv=None):
+    import graphviz
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[30, 100, 300, 1000, 3000])
+    parser.add_argument("--shapes", nargs="+", choices=SHAPES, default=list(SHAPES))
+    parser.add_argument("--engines", nargs="+", choices=sorted(graphviz.ENGINES), default=list(LAYOUT_ENGINES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=30.0,
+                        help="skip larger charts for an engine once a layout takes this long (s)")
+    parser.add_argument("--target", type=float, default=1.0, help="interactive latency target (s)")
+    parser.add_argument("--output", help="write raw results and limits to this JSON file")
+    args = parser.parse_args(argv)
+
+    try:
+        graphviz.version()
+    except graphviz.ExecutableNotFound:
+        sys.exit("graphviz binaries not found; install graphviz to run the engine benchmark")
+
+    results = run(args.sizes, args.shapes, args.engines, args.repeat, args.budget)
+    limits = engine_limits(results, args.target)
+    print(f"\nLargest chart (nodes + edges) laid out within {args.target}s:")
+    for engine, limit in sorted(limits.items(), key=lambda item: item[1]):
+        print(f"  {engine:>6}  {limit}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"graphviz": ".".join(map(str, graphviz.version())), "target": args.target,
+                       "limits": limits, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
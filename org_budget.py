@@ -0,0 +1,62 @@
+"""Inverse of the costing: which slider settings fit a budget.
+
+Total cost never falls as staff scale or seniority rises (with the other
+sliders held), so the largest setting that fits is found by bisection
+over the discrete slider steps: a handful of cost evaluations per
+frontier point instead of a scan, or a user dragging sliders by hand.
+"""
+from dataclasses import dataclass
+
+from org_model import SENIORITY_RANGE, STAFF_SCALE_RANGE, cached_org
+
+
+def bisect_max(lo, hi, fits):
+    """Largest ``x`` in ``lo..hi`` with ``fits(x)``, or None; ``fits`` must be true up to a point and false after."""
+    if not fits(lo):
+        return None
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if fits(mid):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+@dataclass(frozen=True)
+class Frontier:
+    """Most staff scale per seniority and most seniority per staff scale within ``budget``.
+
+    Values are slider inputs; None means even the lowest setting is over budget.
+    """
+    budget: int
+    workers_per_mgr: int
+    show_content_as_team: bool
+    max_staff_scale: dict
+    max_seniority: dict
+
+
+def budget_frontier(budget, workers_per_mgr, show_content_as_team, cost=None, pay=None):
+    """Feasible frontier for ``budget`` with the span of control and content toggle fixed.
+
+    ``cost(staff_scale_input, seniority_input, workers_per_mgr, show_content_as_team)``
+    defaults to the cached model's total; the app passes its cost cube's lookup.
+    """
+    if cost is None:
+        def cost(*params):
+            return cached_org(*params, pay=pay).total_cost
+
+    def fits(staff_scale_input, seniority_input):
+        return cost(staff_scale_input, seniority_input, workers_per_mgr, show_content_as_team) <= budget
+
+    seniorities = range(SENIORITY_RANGE[0], SENIORITY_RANGE[1] + 1)
+    staff_scales = range(STAFF_SCALE_RANGE[0], STAFF_SCALE_RANGE[1] + 1)
+    max_staff_scale = {
+        seniority: bisect_max(*STAFF_SCALE_RANGE, lambda staff_scale: fits(staff_scale, seniority))
+        for seniority in seniorities
+    }
+    max_seniority = {
+        staff_scale: bisect_max(*SENIORITY_RANGE, lambda seniority: fits(staff_scale, seniority))
+        for staff_scale in staff_scales
+    }
+    return Frontier(budget, workers_per_mgr, show_content_as_team, max_staff_scale, max_seniority)
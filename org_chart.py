@@ -0,0 +1,305 @@
+"""Org chart rendering for an ``OrgModel``.
+
+``emit_dot`` writes DOT text straight into one buffer. It relies on node
+and edge defaults, so each element only carries the attributes that
+differ from its neighbours, and it returns the text with a content hash.
+DOT sources are memoized per model structure. Rendered SVGs
+are cached by content hash, in memory and in an on-disk cache shared by
+every process on the host, so scenarios and sessions that draw the same
+chart share one layout. All caches are bounded LRUs. graphviz is only
+imported once a chart is actually rendered.
+"""
+import hashlib
+import itertools
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import NamedTuple
+
+from org_layout import LAYOUT_WORKERS, parallel_svg
+from org_model import cached_org
+from org_svg_cache import SvgDiskCache
+
+CHART_ENGINE = "circo"
+LAYOUT_ENGINES = ("circo", "dot", "twopi", "sfdp")
+# (max nodes + edges, engine), first match wins; anything larger gets LARGE_CHART_ENGINE.
+# Conservative defaults: circo's radial look for the usual chart sizes (every
+# slider setting stays under 250), dot for hierarchies of a few thousand
+# elements and sfdp beyond. Layout speed depends on the host's graphviz
+# build, so set ORG_ENGINE_BENCH to the JSON org_bench_engines.py --output
+# writes on the deployment host to use the limits measured there instead.
+ENGINE_LIMITS = ((250, CHART_ENGINE), (6000, "dot"))
+LARGE_CHART_ENGINE = "sfdp"
+
+
+def engine_limits_from_bench(path):
+    """(ENGINE_LIMITS, LARGE_CHART_ENGINE) from ``org_bench_engines.py --output`` JSON.
+
+    circo up to its measured limit, then whichever other engine handled the
+    largest charts within the target.
+    """
+    with open(path) as f:
+        limits = json.load(f)["limits"]
+    others = [engine for engine in LAYOUT_ENGINES if engine != CHART_ENGINE and engine in limits]
+    large = max(others, key=lambda engine: limits[engine], default=LARGE_CHART_ENGINE)
+    return ((limits.get(CHART_ENGINE, 0), CHART_ENGINE),), large
+
+
+if os.environ.get("ORG_ENGINE_BENCH"):
+    ENGINE_LIMITS, LARGE_CHART_ENGINE = engine_limits_from_bench(os.environ["ORG_ENGINE_BENCH"])
+
+# Rendered charts kept per process; SVGs are a few hundred KB at most
+CHART_CACHE_SIZE = 128
+# Charts with more nodes + edges than this lay each team out in parallel (see
+# org_layout). Splitting costs a second render pass, so it only pays off for
+# the biggest charts and only with more than one core to spread over.
+PARALLEL_LAYOUT_MIN = int(os.environ.get("ORG_PARALLEL_LAYOUT_MIN", 6000))
+# Above this many posts workers are drawn as one node per (manager, level)
+CHART_NODE_THRESHOLD = int(os.environ.get("ORG_CHART_NODE_THRESHOLD", 200))
+
+color_map = {"1_FSS": "blue", "2_Systems": "red", "3_Content": "green"}
+
+
+_BARE_ID = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|-?(\.[0-9]+|[0-9]+(\.[0-9]*)?)")
+
+
+def _quote(value):
+    value = str(value)
+    if _BARE_ID.fullmatch(value):
+        return value
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+
+
+def _attrs(attrs):
+    return " ".join(f"{key}={_quote(value)}" for key, value in attrs.items())
+
+
+def _post_label(post):
+    return f"""{post.role}
+Level {post.level}-{post.spine:02}"""
+
+
+def _group_label(group):
+    return f"""{group.role} ×{group.count}
+Level {group.level}-{group.spine:02}
+£{group.cost:,.0f}"""
+
+
+def _emit_workers(add, workers, indent, collapsed):
+    """One anonymous scope per team; node defaults change only between levels."""
+    for team, run in itertools.groupby(workers, key=lambda w: w[2].team):
+        color = color_map.get(team, "black")
+        add(f"{indent}{{")
+        add(f"{indent}\tnode [color={color}]")
+        add(f"{indent}\tedge [color={color} style=dashed]")
+        defaults = None
+        for node_id, label, worker in run:
+            shared = {"penwidth": f"{0.25 + 3.75 * ((worker.spine - 13) / (57 - 13)):.2f}"}
+            if not collapsed:
+                # Every worker at a level has the same label
+                shared = {"label": label, **shared}
+            if shared != defaults:
+                add(f"{indent}\tnode [{_attrs(shared)}]")
+                defaults = shared
+            node = _quote(node_id)
+            add(f"{indent}\t{node} [label={_quote(label)}]" if collapsed else f"{indent}\t{node}")
+            add(f"{indent}\t{_quote(worker.reports_to)} -> {node}")
+        add(f"{indent}}}")
+
+
+class ChartDot(NamedTuple):
+    source: str
+    digest: str
+    nodes: int
+    edges: int
+
+
+def choose_engine(nodes, edges):
+    """Layout engine for a chart with this many nodes and edges."""
+    for max_elements, engine in ENGINE_LIMITS:
+        if nodes + edges <= max_elements:
+            return engine
+    return LARGE_CHART_ENGINE
+
+
+def _worker_items(model, collapsed):
+    """(node id, label, post or group) for every worker node."""
+    if collapsed:
+        return [(f"{group.reports_to}_{group.team}_L{group.level}", _group_label(group), group)
+                for group in model.post_groups]
+    return [(post.node_id, _post_label(post), post) for post in model.posts[len(model.leaders):]]
+
+
+def manager_edge(post, indent="\t"):
+    """Edge from the director to a manager, as emitted outside the manager scope."""
+    return f"{indent}{_quote(post.reports_to)} -> {_quote(post.node_id)} [color={color_map.get(post.team, 'black')} penwidth=2]"
+
+
+def _emit(director, managers, workers, collapsed):
+    out = [
+        "digraph {",
+        "\tgraph [fontsize=6 nodesep=1.0 ranksep=1.5]",
+        "\tnode [fontsize=6]",
+        "\tedge [fontsize=6]",
+    ]
+    add = out.append
+
+    if director is not None:
+        director_penwidth = 0.25 + 3.75 * ((director.spine - 13) / (57 - 13))
+        attrs = {"label": _post_label(director), "penwidth": f"{director_penwidth:.2f}", "shape": "hexagon"}
+        add(f"\t{_quote(director.node_id)} [{_attrs(attrs)}]")
+
+    if managers:
+        add("\t{")
+        add("\t\tnode [shape=box style=rounded]")
+        add("\t\tedge [penwidth=2]")
+        for post in managers:
+            color = color_map.get(post.team, "black")
+            penwidth = 0.25 + 3.75 * ((post.spine - 17) / (53 - 17))
+            node = _quote(post.node_id)
+            attrs = {"label": _post_label(post), "color": color, "penwidth": f"{penwidth:.2f}"}
+            add(f"\t\t{node} [{_attrs(attrs)}]")
+            if director is not None:
+                add(f"\t\t{_quote(post.reports_to)} -> {node} [color={color}]")
+        add("\t}")
+
+    _emit_workers(add, [w for w in workers if not w[2].merged], "\t", collapsed)
+
+    # Merged content workers sit together in a cluster
+    merged_content_workers = [w for w in workers if w[2].merged]
+    if merged_content_workers:
+        add("\tsubgraph cluster_merged_content {")
+        add('\t\tlabel="Merged Content Workers"')
+        add("\t\tstyle=dashed")
+        _emit_workers(add, merged_content_workers, "\t\t", collapsed)
+        add("\t}")
+    add("}")
+
+    source = "\n".join(out) + "\n"
+    digest = hashlib.blake2b(source.encode(), digest_size=16).hexdigest()
+    nodes = len(managers) + len(workers) + (director is not None)
+    edges = len(workers) + (len(managers) if director is not None else 0)
+    return ChartDot(source, digest, nodes, edges)
+
+
+def _resolve_collapsed(model, collapsed):
+    return model.headcount > CHART_NODE_THRESHOLD if collapsed is None else collapsed
+
+
+def emit_dot(model, collapsed=None):
+    """DOT source for ``model`` with its content hash and node/edge counts.
+
+    ``collapsed`` draws one node per (manager, level) with a count and
+    subtotal instead of one per worker. By default it switches on once the
+    model has more than ``CHART_NODE_THRESHOLD`` posts.
+    """
+    collapsed = _resolve_collapsed(model, collapsed)
+    return _emit(model.leaders[0], model.leaders[1:], _worker_items(model, collapsed), collapsed)
+
+
+def emit_team_dots(model, collapsed=None):
+    """(team, ``ChartDot``) per top-level team, without the director.
+
+    Each graph holds a team's managers and every worker reporting to them,
+    so merged content workers (and their cluster) travel with FSS.
+    """
+    collapsed = _resolve_collapsed(model, collapsed)
+    managers = model.leaders[1:]
+    team_of = {post.node_id: post.team for post in managers}
+    workers = _worker_items(model, collapsed)
+    return [
+        (team, _emit(None, [post for post in managers if post.team == team],
+                     [w for w in workers if team_of[w[2].reports_to] == team], collapsed))
+        for team in dict.fromkeys(post.team for post in managers)
+    ]
+
+
+def emit_director_dot(model):
+    return _emit(model.leaders[0], [], [], False)
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def _chart_dot(model, collapsed):
+    return emit_dot(model, collapsed)
+
+
+def chart_dot(*params, pay=None, collapsed=None):
+    """``ChartDot`` for one scenario, shared by every scenario with the same structure."""
+    return _chart_dot(cached_org(*params, pay=pay), collapsed)
+
+
+_svg_cache = OrderedDict()
+_svg_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def svg_disk_cache():
+    return SvgDiskCache()
+
+
+def _cached_svg(key, render):
+    """SVG cached under ``key``: this process's LRU, then the shared disk cache, then ``render()``."""
+    import graphviz
+
+    with _svg_lock:
+        if key in _svg_cache:
+            _svg_cache.move_to_end(key)
+            return _svg_cache[key]
+    svg = svg_disk_cache().get(key)
+    if svg is None:
+        try:
+            svg = render()
+        except graphviz.ExecutableNotFound:
+            return None
+        svg_disk_cache().put(key, svg)
+    with _svg_lock:
+        _svg_cache[key] = svg
+        if len(_svg_cache) > CHART_CACHE_SIZE:
+            _svg_cache.popitem(last=False)
+    return svg
+
+
+def render_svg(source, digest, engine=CHART_ENGINE):
+    """Laid-out SVG for DOT ``source``, cached by its content hash.
+
+    Looks in this process's LRU first, then in the on-disk cache shared
+    with other processes, and only then runs the layout. Returns None when
+    the graphviz binaries are not installed.
+    """
+    def render():
+        import graphviz
+
+        return graphviz.Source(source, engine=engine).pipe(format="svg", encoding="utf-8")
+
+    return _cached_svg(f"{digest}-{engine}", render)
+
+
+def render_chart_svg(model, chart, engine, collapsed=None):
+    """``render_svg`` for ``chart`` as emitted from ``model`` with ``collapsed``.
+
+    Past ``PARALLEL_LAYOUT_MIN`` nodes + edges, on a multi-core host, each
+    team is laid out on its own, concurrently, and the pieces are composed
+    under the Director.
+    """
+    if LAYOUT_WORKERS < 2 or chart.nodes + chart.edges <= PARALLEL_LAYOUT_MIN:
+        return render_svg(chart.source, chart.digest, engine)
+
+    def render():
+        teams = [team.source for _, team in emit_team_dots(model, collapsed)]
+        edges = [manager_edge(post) for post in model.leaders[1:]]
+        return parallel_svg(emit_director_dot(model).source, teams, edges, engine)
+
+    return _cached_svg(f"{chart.digest}-{engine}-parallel", render)
+
+
+def chart_svg(*params, pay=None, collapsed=None, engine=None):
+    """Server-side rendered SVG, or None when the graphviz binaries are missing.
+
+    ``engine`` defaults to ``choose_engine`` for the chart's size.
+    """
+    chart = chart_dot(*params, pay=pay, collapsed=collapsed)
+    model = cached_org(*params, pay=pay)
+    return render_chart_svg(model, chart, engine or choose_engine(chart.nodes, chart.edges), collapsed)
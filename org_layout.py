@@ -0,0 +1,134 @@
+"""Lay out a very large chart as independent pieces and stitch them together.
+
+Each top-level team is its own subtree under the Director, so its layout
+does not depend on the others. ``parallel_svg`` lays every piece out at
+the same time (graphviz runs as a subprocess, so a thread pool keeps all
+cores busy without forking the server), reads the positions back from
+graphviz's ``json0`` output, places the pieces side by side under the
+Director and renders the result with ``neato -n2``, which draws the given
+positions and only routes the edges that have none.
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+LAYOUT_WORKERS = int(os.environ.get("ORG_LAYOUT_WORKERS", os.cpu_count() or 1))
+PIECE_GAP = 72  # points between neighbouring pieces and below the Director
+
+# json0 keys that are structure or bookkeeping rather than DOT attributes
+_SKIP = {"_gvid", "_subgraph_cnt", "name", "directed", "strict", "nodes", "edges", "subgraphs",
+         "objects", "tail", "head", "bb", "pos", "lp"}
+# Edge attributes holding points, besides "pos"
+_EDGE_POINTS = ("lp", "xlp", "head_lp", "tail_lp")
+
+
+def layout_json(source, engine):
+    """graphviz's ``json0`` layout of DOT ``source``."""
+    import graphviz
+
+    return json.loads(graphviz.Source(source, engine=engine).pipe(format="json0", encoding="utf-8"))
+
+
+def _bb(value):
+    return tuple(float(v) for v in value.split(","))
+
+
+def _shift_point(point, dx, dy):
+    x, y = point.split(",")[:2]
+    return f"{float(x) + dx:.2f},{float(y) + dy:.2f}"
+
+
+def _shift_spline(pos, dx, dy):
+    """Move an edge ``pos`` ("[s,x,y ][e,x,y ]x,y x,y ...", possibly several splines joined by ';')."""
+    splines = []
+    for spline in pos.split(";"):
+        points = []
+        for point in spline.split():
+            if point[:2] in ("s,", "e,"):
+                points.append(point[:2] + _shift_point(point[2:], dx, dy))
+            else:
+                points.append(_shift_point(point, dx, dy))
+        splines.append(" ".join(points))
+    return ";".join(splines)
+
+
+def _q(value):
+    # json0 values are the attribute strings as graphviz stores them, so only
+    # quotes need escaping; "\n" and friends must reach the renderer untouched
+    return '"' + str(value).replace('"', '\\"') + '"'
+
+
+def _attrs(obj, skip=_SKIP):
+    return " ".join(f"{key}={_q(value)}" for key, value in obj.items() if key not in skip)
+
+
+def _emit_piece(add, layout, dx, dy, prefix):
+    objects = layout.get("objects", [])
+    clusters = objects[:layout.get("_subgraph_cnt", 0)]
+    nodes = objects[len(clusters):]
+    for i, cluster in enumerate(clusters):
+        if not cluster.get("name", "").startswith("cluster") or "bb" not in cluster:
+            continue
+        llx, lly, urx, ury = _bb(cluster["bb"])
+        attrs = [f'bb="{llx + dx:.2f},{lly + dy:.2f},{urx + dx:.2f},{ury + dy:.2f}"']
+        if "lp" in cluster:
+            attrs.append(f'lp="{_shift_point(cluster["lp"], dx, dy)}"')
+        attrs.append(_attrs(cluster))
+        add(f"\tsubgraph cluster_{prefix}_{i} {{")
+        add(f"\t\tgraph [{' '.join(attrs)}]")
+        for gvid in cluster.get("nodes", []):
+            add(f"\t\t{_q(objects[gvid]['name'])}")
+        add("\t}")
+    for node in nodes:
+        add(f'\t{_q(node["name"])} [pos="{_shift_point(node["pos"], dx, dy)}" {_attrs(node)}]')
+    for edge in layout.get("edges", []):
+        tail = _q(objects[edge["tail"]]["name"])
+        head = _q(objects[edge["head"]]["name"])
+        points = {key: _shift_point(edge[key], dx, dy) for key in _EDGE_POINTS if key in edge}
+        points["pos"] = _shift_spline(edge["pos"], dx, dy) if "pos" in edge else None
+        shifted = " ".join(f'{key}="{value}"' for key, value in points.items() if value)
+        add(f'\t{tail} -> {head} [{shifted} {_attrs(edge, _SKIP | set(_EDGE_POINTS))}]')
+
+
+def compose_layouts(top, pieces, edges, gap=PIECE_GAP):
+    """DOT source placing laid-out ``pieces`` side by side under ``top``.
+
+    ``top`` and ``pieces`` are ``json0`` layouts; the pieces are aligned on
+    their top edge and ``top`` is centred above them. ``edges`` are DOT
+    edge statements joining ``top`` to the pieces; they carry no position
+    and are routed by the renderer.
+    """
+    boxes = [_bb(piece["bb"]) for piece in pieces]
+    row_width = sum(urx - llx for llx, _, urx, _ in boxes) + gap * max(len(boxes) - 1, 0)
+    row_height = max((ury - lly for _, lly, _, ury in boxes), default=0)
+    top_llx, top_lly, top_urx, top_ury = _bb(top["bb"])
+    width = max(row_width, top_urx - top_llx)
+    height = row_height + gap + top_ury - top_lly
+
+    out = ["digraph {"]
+    add = out.append
+    add(f'\tgraph [bb="0,0,{width:.2f},{height:.2f}" {_attrs(top)}]')
+    x = (width - row_width) / 2
+    for i, (piece, (llx, _, urx, ury)) in enumerate(zip(pieces, boxes)):
+        # Top-align every piece along y = row_height
+        _emit_piece(add, piece, x - llx, row_height - ury, f"piece{i}")
+        x += urx - llx + gap
+    _emit_piece(add, top, (width - (top_urx - top_llx)) / 2 - top_llx, row_height + gap - top_lly, "top")
+    out.extend(edges)
+    add("}")
+    return "\n".join(out) + "\n"
+
+
+def parallel_svg(top_source, piece_sources, edges, engine, workers=LAYOUT_WORKERS):
+    """SVG of ``top_source`` above ``piece_sources``, each piece laid out concurrently with ``engine``.
+
+    Raises ``graphviz.ExecutableNotFound`` when the binaries are missing.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(piece_sources) + 1))) as pool:
+        top = pool.submit(layout_json, top_source, "dot")
+        pieces = list(pool.map(lambda source: layout_json(source, engine), piece_sources))
+        top = top.result()
+    import graphviz
+
+    composed = compose_layouts(top, pieces, edges)
+    return graphviz.Source(composed, engine="neato").pipe(format="svg", encoding="utf-8", neato_no_op=2)
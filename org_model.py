@@ -0,0 +1,577 @@
+"""Headless costing model behind the restructure chart.
+
+Everything in here is pure: it takes the slider values and returns an
+immutable ``OrgModel`` (posts, costs and reporting lines) without touching
+Streamlit, graphviz or pandas, so it can be called in tight loops.
+"""
+import math
+import os
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from org_pay import PayStructure, PayStructureFile, uplift_spine
+
+# --- Salary Spine Data (loaded from pay_structures/*.toml) ---
+PAY_STRUCTURE_DIR = Path(__file__).with_name("pay_structures")
+DEFAULT_PAY_STRUCTURE = Path(os.environ.get("ORG_PAY_STRUCTURE", PAY_STRUCTURE_DIR / "default.toml"))
+# Compiled pay structures kept by pay_structure()
+PAY_CACHE_SIZE = 16
+
+
+def pay_structure_files():
+    return sorted(PAY_STRUCTURE_DIR.glob("*.toml"))
+
+
+@lru_cache(maxsize=None)
+def _pay_file(path):
+    return PayStructureFile(Path(path or DEFAULT_PAY_STRUCTURE).resolve())
+
+
+def pay_config(path=None):
+    """Parsed pay structure file, re-read only when it has changed on disk."""
+    return _pay_file(path).load()
+
+
+def pay_config_error(path=None):
+    """Why the file last failed to load, or None; ``pay_config`` keeps serving the last good version."""
+    return _pay_file(path).error
+
+
+@lru_cache(maxsize=PAY_CACHE_SIZE)
+def _pay_structure(config, uplift_pct, rounding):
+    return PayStructure(uplift_spine(config.base_spine, uplift_pct, rounding), config.level_ranges,
+                        key=(config.path, config.version, uplift_pct, rounding))
+
+
+def pay_structure(uplift_pct=None, rounding=None, path=None):
+    """Compiled structure for one pay award, built once per (file version, uplift, rounding).
+
+    Uplift and rounding default to the values in the file.
+    """
+    config = pay_config(path)
+    return _pay_structure(config,
+                          float(config.uplift_pct if uplift_pct is None else uplift_pct),
+                          int(config.rounding if rounding is None else rounding))
+
+
+# --- Slider ranges (min, max) ---
+STAFF_SCALE_RANGE = (32, 100)
+SENIORITY_RANGE = (70, 100)
+WORKERS_PER_MGR_RANGE = (5, 10)
+
+TEAMS = ("0_Director", "1_FSS", "2_Systems", "3_Content")
+ROLES = ("Director", "FSS manager", "Systems manager", "Content manager",
+         "FSS worker", "Systems worker", "Content worker")
+
+# Listing column -> PostStore field
+LISTING_COLUMNS = {"role name": "role", "level": "level", "spline": "spine", "cost": "salary"}
+# Role code -> rank of its name in alphabetical order, so "role name" sorts by name
+ROLE_NAME_RANK = np.argsort(np.argsort(ROLES))
+
+# Scenarios kept by cached_org(); shared by every session in the process
+MODEL_CACHE_SIZE = 512
+
+
+def get_salary(level, seniority_pct, pay=None):
+    return (pay or pay_structure()).salary(level, seniority_pct)
+
+
+# --- Slider transforms ---
+def staff_scale_from_input(staff_scale_input):
+    return (staff_scale_input - 29) * (100 / (100 - 29))
+
+
+def seniority_from_input(seniority_input):
+    return (seniority_input - 76) * (100 / (100 - 76))
+
+
+# --- Team Counts ---
+@dataclass(frozen=True)
+class TeamCounts:
+    fss_num_staff: int
+    system_num_staff: int
+    content_num_staff: int
+    fss_num_managers: int
+
+
+def team_counts(staff_scale, workers_per_mgr, show_content_as_team):
+    fss_num_staff = int(5 + (15 * staff_scale / 100))
+    system_num_staff = int(3 + (7 * staff_scale / 100))
+    content_num_staff = min(3, int(1 + (4 * staff_scale / 100)))
+    total_fss_workers = fss_num_staff + (0 if show_content_as_team else content_num_staff)
+    fss_num_managers = max(1, round(total_fss_workers / workers_per_mgr))
+    return TeamCounts(fss_num_staff, system_num_staff, content_num_staff, fss_num_managers)
+
+
+# --- Worker grade mix ---
+WORKER_LEVELS = (4, 3, 2)  # most senior first
+
+
+def min_senior_share(seniority_pct):
+    """Least share of a team's workers on the top worker level for a seniority.
+
+    Runs from a quarter at 0% seniority to everyone at 100%, clamped to 0-1.
+    """
+    return min(max(0.25 + 0.75 * seniority_pct / 100, 0.0), 1.0)
+
+
+@lru_cache(maxsize=4096)
+def optimal_mix(count, salaries, min_senior, span):
+    """Cheapest workers per level (most senior first) by branch and bound.
+
+    ``salaries`` are per level, most senior first. At least ``min_senior``
+    workers sit on the top level, and no level holds more than ``span``
+    workers per post on the level above, so every grade has someone to
+    report to. Salaries need not fall with level.
+
+    Levels are branched top down. Each count is bounded by an LP
+    relaxation of the levels below it: exact when two levels are left,
+    otherwise the cheapest levels filled first up to what the posts above
+    could manage. The bound is convex in the count, so counts are tried
+    outwards from its minimum and each side stops at the first one that
+    cannot beat the best mix so far. With one level left above the last,
+    cost is linear in its count and the cheaper end of its range is taken
+    directly.
+    """
+    depth = len(salaries)
+    min_senior = min(min_senior, count)
+    # Levels below each level, cheapest first
+    below = [sorted(range(i + 1, depth), key=salaries.__getitem__) for i in range(depth)]
+    # Most workers the levels below level i can hold per post at level i
+    capacity = [sum(span ** d for d in range(1, depth - i)) for i in range(depth)]
+    best = [math.inf, None]
+    counts = [0] * depth
+
+    def tail_bound(i, posts, remaining):
+        if i == depth - 3:
+            # Two levels left: the LP optimum sits at one end of the middle level's range
+            low, high = remaining / (1 + span), min(remaining, posts * span)
+            if low > high:
+                return math.inf
+            return min(x * salaries[i + 1] + (remaining - x) * salaries[i + 2] for x in (low, high))
+        cost = 0
+        for j in below[i]:
+            take = min(remaining, posts * span ** (j - i))
+            cost += take * salaries[j]
+            remaining -= take
+        return math.inf if remaining else cost
+
+    def search(i, remaining, above, cost):
+        if i == depth - 1:
+            if i > 0 and remaining > above * span:
+                return
+            total = cost + remaining * salaries[i]
+            if total < best[0]:
+                counts[i] = remaining
+                best[:] = [total, tuple(counts)]
+            return
+
+        def bound(n):
+            return cost + n * salaries[i] + tail_bound(i, n, remaining - n)
+
+        lo = min_senior if i == 0 else 0
+        # Enough posts here for the levels below to take the rest
+        lo = max(lo, -(-remaining // (1 + capacity[i])))
+        hi = remaining if i == 0 else min(remaining, above * span)
+        if i == depth - 2:
+            # Cost is linear in n once only the last level is left
+            n = hi if salaries[i] < salaries[i + 1] else lo
+            counts[i] = n
+            search(i + 1, remaining - n, n, cost + n * salaries[i])
+            return
+        start, stop = lo, hi
+        while start < stop:
+            mid = (start + stop) // 2
+            if bound(mid + 1) < bound(mid):
+                start = mid + 1
+            else:
+                stop = mid
+        for side in (range(start, hi + 1), range(start - 1, lo - 1, -1)):
+            for n in side:
+                if bound(n) >= best[0]:
+                    break
+                counts[i] = n
+                search(i + 1, remaining - n, n, cost + n * salaries[i])
+
+    search(0, count, None, 0)
+    return best[1]
+
+
+def grade_mix(count, level_pay, senior_share, span):
+    """(level, workers) for one team's cheapest mix, largest bucket first, empty levels left out."""
+    salaries = tuple(level_pay[level][0] for level in WORKER_LEVELS)
+    # Tolerance so float noise in the share never adds a whole worker
+    min_senior = math.ceil(count * senior_share - 1e-9)
+    mix = optimal_mix(count, salaries, min_senior, max(1, span))
+    # Sort by descending count so larger buckets are dealt out first
+    return sorted(((level, n) for level, n in zip(WORKER_LEVELS, mix) if n), key=lambda x: -x[1])
+
+
+# --- Model result ---
+@dataclass(frozen=True)
+class Post:
+    """One post in the structure; ``node_id`` doubles as its chart node name."""
+    node_id: str
+    role: str
+    team: str
+    level: int
+    spine: int
+    salary: int
+    reports_to: str | None = None
+    merged: bool = False  # content worker folded into the first FSS manager
+
+
+@dataclass(frozen=True)
+class PostGroup:
+    """``count`` identical worker posts: one team, level and manager."""
+    team: str
+    role: str
+    level: int
+    spine: int
+    salary: int
+    reports_to: str
+    count: int
+    merged: bool = False
+
+    @property
+    def cost(self):
+        return self.salary * self.count
+
+
+@dataclass(frozen=True)
+class TeamWorkers:
+    """A team's workers as per-level counts, dealt round-robin to ``managers``.
+
+    ``levels`` holds (level, count, spine, salary) with the largest bucket
+    first, which is the order individual posts are dealt out in.
+    """
+    team: str
+    role: str
+    managers: tuple
+    levels: tuple
+    merged: bool = False
+
+    @property
+    def count(self):
+        return sum(n for _, n, _, _ in self.levels)
+
+    @property
+    def cost(self):
+        return sum(n * salary for _, n, _, salary in self.levels)
+
+    def groups(self):
+        """Counts per (level, manager), without materializing any posts."""
+        m = len(self.managers)
+        offset = 0
+        for level, n, spine, salary in self.levels:
+            for j, manager in enumerate(self.managers):
+                # Workers offset..offset+n-1 go to manager k % m
+                count = -((j - offset - n) // m) + ((j - offset) // m)
+                if count:
+                    yield PostGroup(self.team, self.role, level, spine, salary, manager, count, self.merged)
+            offset += n
+
+    def posts(self, first_id=0):
+        m = len(self.managers)
+        k = 0
+        for level, n, spine, salary in self.levels:
+            for _ in range(n):
+                yield Post(f"{self.team}_Worker_{first_id + k}", self.role, self.team, level, spine, salary,
+                           self.managers[k % m], self.merged)
+                k += 1
+
+
+@dataclass(frozen=True)
+class PostStore:
+    """Every post of a model as parallel compact arrays, one row per post.
+
+    Team and role are small integer codes into ``TEAMS`` and ``ROLES``;
+    ``manager`` is the row of the line manager (-1 for the director). The
+    first ``len(leader_ids)`` rows are the director and managers, the rest
+    are workers in node-numbering order.
+    """
+    team: np.ndarray
+    role: np.ndarray
+    level: np.ndarray
+    spine: np.ndarray
+    salary: np.ndarray
+    manager: np.ndarray
+    merged: np.ndarray
+    leader_ids: tuple
+
+    def __len__(self):
+        return len(self.salary)
+
+    @property
+    def total_cost(self):
+        return int(self.salary.sum(dtype=np.int64))
+
+    def node_id(self, row):
+        if row < len(self.leader_ids):
+            return self.leader_ids[row]
+        return f"{TEAMS[self.team[row]]}_Worker_{row - len(self.leader_ids)}"
+
+    @cached_property
+    def listing_order(self):
+        """Rows in listing order (team, role name, level, spine), computed once per store."""
+        return np.lexsort((self.spine, self.level, ROLE_NAME_RANK[self.role], self.team))
+
+    @cached_property
+    def _sort_orders(self):
+        return {}
+
+    def listing_rows(self, roles=None, sort_by=None, descending=False):
+        """Row indices for a filtered, sorted view of the listing.
+
+        ``roles`` keeps only those role names; ``sort_by`` is a listing
+        column, with ties left in listing order. Sort orders are built once
+        per store and filtering is one vectorized mask, so paging through
+        a view never touches more than the rows it shows.
+        """
+        order = self.listing_order
+        if sort_by is not None:
+            key = (sort_by, descending)
+            if key not in self._sort_orders:
+                column = getattr(self, LISTING_COLUMNS[sort_by])[order]
+                if sort_by == "role name":
+                    column = ROLE_NAME_RANK[column]
+                if descending:
+                    column = -column.astype(np.int64)
+                self._sort_orders[key] = order[np.argsort(column, kind="stable")]
+            order = self._sort_orders[key]
+        if roles is not None:
+            codes = [ROLES.index(role) for role in roles]
+            order = order[np.isin(self.role[order], codes)]
+        return order
+
+    def frame(self, rows=None):
+        """Listing as a typed pandas DataFrame.
+
+        ``rows`` picks and orders rows (for example ``listing_order``);
+        without it the columns share memory with the store.
+        """
+        import pandas as pd
+
+        columns = (self.role, self.team, self.level, self.spine, self.salary)
+        if rows is not None:
+            columns = tuple(column[rows] for column in columns)
+        role, team, level, spine, salary = columns
+        return pd.DataFrame({
+            "role name": pd.Categorical.from_codes(role, ROLES, validate=False),
+            "team": pd.Categorical.from_codes(team, TEAMS, validate=False),
+            "level": level,
+            "spline": spine,
+            "cost": salary,
+        }, copy=False)
+
+    @classmethod
+    def from_model(cls, model):
+        leaders = model.leaders
+        leader_rows = {post.node_id: row for row, post in enumerate(leaders)}
+        columns = {name: [np.array([getattr(post, name) for post in leaders])]
+                   for name in ("level", "spine", "salary", "merged")}
+        columns["team"] = [np.array([TEAMS.index(post.team) for post in leaders])]
+        columns["role"] = [np.array([ROLES.index(post.role) for post in leaders])]
+        columns["manager"] = [np.array([leader_rows.get(post.reports_to, -1) for post in leaders])]
+        for team in model.teams:
+            n = team.count
+            per_level = [count for _, count, _, _ in team.levels]
+            for name, i in (("level", 0), ("spine", 2), ("salary", 3)):
+                columns[name].append(np.repeat([entry[i] for entry in team.levels], per_level))
+            columns["team"].append(np.full(n, TEAMS.index(team.team)))
+            columns["role"].append(np.full(n, ROLES.index(team.role)))
+            columns["merged"].append(np.full(n, team.merged))
+            managers = np.array([leader_rows[manager] for manager in team.managers])
+            columns["manager"].append(managers[np.arange(n) % len(managers)])
+        dtypes = {"team": np.int8, "role": np.int8, "level": np.int8, "spine": np.int16,
+                  "salary": np.int32, "manager": np.int32, "merged": bool}
+        arrays = {name: np.concatenate(parts).astype(dtypes[name]) for name, parts in columns.items()}
+        return cls(leader_ids=tuple(leader_rows), **arrays)
+
+
+@dataclass(frozen=True)
+class OrgModel:
+    """Costed structure: leaders as individual posts, workers as counts.
+
+    Individual worker posts are only built when ``posts`` is first read,
+    so costing a large structure never allocates one object per post.
+    Models compare equal when their structure is the same, whatever slider
+    values produced them, so downstream caches keyed on a model are shared.
+    """
+    staff_scale_input: int = field(compare=False)
+    seniority_input: int = field(compare=False)
+    workers_per_mgr: int = field(compare=False)
+    show_content_as_team: bool = field(compare=False)
+    counts: TeamCounts
+    leaders: tuple
+    teams: tuple
+    total_cost: int
+
+    @property
+    def params(self):
+        return (self.staff_scale_input, self.seniority_input, self.workers_per_mgr, self.show_content_as_team)
+
+    @property
+    def headcount(self):
+        return len(self.leaders) + sum(team.count for team in self.teams)
+
+    @property
+    def post_groups(self):
+        return tuple(group for team in self.teams for group in team.groups())
+
+    def iter_posts(self):
+        yield from self.leaders
+        first_id = 0
+        for team in self.teams:
+            yield from team.posts(first_id)
+            first_id += team.count
+
+    @cached_property
+    def posts(self):
+        return tuple(self.iter_posts())
+
+    @property
+    def store(self):
+        return _post_store(self)
+
+    @property
+    def reporting_lines(self):
+        return tuple((post.reports_to, post.node_id) for post in self.iter_posts() if post.reports_to is not None)
+
+
+def _manager(node_id, role, team, level_pay, reports_to="Boss"):
+    salary, spine = level_pay[5]
+    return Post(node_id, role, team, 5, spine, salary, reports_to)
+
+
+def _team_workers(team, count, managers, senior_share, span, level_pay, show_content_as_team):
+    is_merged_content = not show_content_as_team and team == "3_Content"
+    team_label = "Content" if is_merged_content else team.split('_')[1]
+    levels = tuple((level, n) + level_pay[level][::-1] for level, n in grade_mix(count, level_pay, senior_share, span))
+    return TeamWorkers(team, f"{team_label} worker", tuple(managers), levels, is_merged_content)
+
+
+def _assemble(counts, senior_share, span, level_pay, show_content_as_team):
+    """(leaders, worker teams, total cost) from the outputs of the earlier stages."""
+    level_pay = dict(level_pay)
+    salary, spine = level_pay[6]
+    leaders = [Post("Boss", "Director", "0_Director", 6, spine, salary)]
+
+    fss_mgr_nodes = [f"FSS_Manager_{i+1}" for i in range(counts.fss_num_managers)]
+    leaders.extend(_manager(mgr_id, "FSS manager", "1_FSS", level_pay) for mgr_id in fss_mgr_nodes)
+    leaders.append(_manager("Sys_Manager", "Systems manager", "2_Systems", level_pay))
+    if show_content_as_team:
+        leaders.append(_manager("Content_Manager", "Content manager", "3_Content", level_pay))
+
+    def workers(team, count, managers):
+        return _team_workers(team, count, managers, senior_share, span, level_pay, show_content_as_team)
+
+    # Round-robin distribution to FSS managers
+    teams = [
+        workers("1_FSS", counts.fss_num_staff, fss_mgr_nodes),
+        workers("2_Systems", counts.system_num_staff, ["Sys_Manager"]),
+    ]
+    # Content workers: integrate with FSS or show separately
+    if show_content_as_team:
+        teams.append(workers("3_Content", counts.content_num_staff, ["Content_Manager"]))
+    else:
+        teams.append(workers("3_Content", counts.content_num_staff, fss_mgr_nodes[:1]))
+
+    total_cost = sum(post.salary for post in leaders) + sum(team.cost for team in teams)
+    return tuple(leaders), tuple(teams), total_cost
+
+
+def _level_pay(pay, seniority):
+    # One lookup per level; every post at a level sits on the same spine point
+    return tuple((level, pay.salary(level, seniority)) for level in pay.levels)
+
+
+def build_org(staff_scale_input, seniority_input, workers_per_mgr, show_content_as_team, pay=None, counts=None):
+    """Cost the structure for one set of slider values (default pay structure unless ``pay``).
+
+    ``counts`` overrides the team sizes derived from the staff scale, for
+    modelling structures beyond the slider range.
+    """
+    pay = pay or pay_structure()
+    seniority = seniority_from_input(seniority_input)
+    if counts is None:
+        counts = team_counts(staff_scale_from_input(staff_scale_input), workers_per_mgr, show_content_as_team)
+    hierarchy = _assemble(counts, min_senior_share(seniority), workers_per_mgr, _level_pay(pay, seniority),
+                          show_content_as_team)
+    return OrgModel(staff_scale_input, seniority_input, workers_per_mgr, show_content_as_team, counts, *hierarchy)
+
+
+# --- Pipeline stages ---
+# cached_org() runs build_org as separately cached stages, each keyed only on
+# its own inputs, so a slider change reruns just the stages that read it:
+# toggling the content team or changing the span of control never recomputes
+# a salary, and a seniority that lands on the same senior share and spine
+# points reuses the whole hierarchy and everything built from it. Downstream,
+# the post store (OrgModel.store) and the DOT source (org_chart.chart_dot)
+# are cached on the model itself.
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _team_counts_stage(staff_scale_input, workers_per_mgr, show_content_as_team):
+    return team_counts(staff_scale_from_input(staff_scale_input), workers_per_mgr, show_content_as_team)
+
+
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _senior_share_stage(seniority_input):
+    return min_senior_share(seniority_from_input(seniority_input))
+
+
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _salaries_stage(seniority_input, pay):
+    return _level_pay(pay, seniority_from_input(seniority_input))
+
+
+_hierarchy_stage = lru_cache(maxsize=MODEL_CACHE_SIZE)(_assemble)
+
+# Stage name -> (cached function, names of the inputs it is called with), in
+# run order. Inputs are slider parameters, ``pay`` or earlier stages.
+PIPELINE = {
+    "team_counts": (_team_counts_stage, ("staff_scale_input", "workers_per_mgr", "show_content_as_team")),
+    "senior_share": (_senior_share_stage, ("seniority_input",)),
+    "salaries": (_salaries_stage, ("seniority_input", "pay")),
+    "hierarchy": (_hierarchy_stage, ("team_counts", "senior_share", "workers_per_mgr", "salaries",
+                                     "show_content_as_team")),
+}
+PARAM_NAMES = ("staff_scale_input", "seniority_input", "workers_per_mgr", "show_content_as_team")
+
+
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _post_store(model):
+    return PostStore.from_model(model)
+
+
+def normalize_params(staff_scale_input, seniority_input, workers_per_mgr, show_content_as_team):
+    """Canonical cache key for one set of slider values."""
+    return (int(staff_scale_input), int(seniority_input), int(workers_per_mgr), bool(show_content_as_team))
+
+
+def _run_pipeline(params, pay, timer=None):
+    stage = timer.stage if timer else lambda name: nullcontext()
+    values = dict(zip(PARAM_NAMES, params), pay=pay)
+    for name, (run, inputs) in PIPELINE.items():
+        with stage(name):
+            values[name] = run(*(values[key] for key in inputs))
+    return OrgModel(*params, values["team_counts"], *values["hierarchy"])
+
+
+_cached_org = lru_cache(maxsize=MODEL_CACHE_SIZE)(_run_pipeline)
+
+
+def cached_org(*params, pay=None, timer=None):
+    """``build_org`` through the cached pipeline stages, memoized on the normalized parameters.
+
+    With a ``timer`` (``org_timing.StageTimer``) every stage is run and
+    timed, each still hitting its own cache, rather than returning the
+    memoized model.
+    """
+    params, pay = normalize_params(*params), pay or pay_structure()
+    if timer is not None:
+        return _run_pipeline(params, pay, timer)
+    return _cached_org(params, pay)
@@ -1,210 +1,192 @@
+import os
+import uuid
+from functools import partial
+
 import streamlit as st
-import graphviz
-import math
-import pandas as pd
-import itertools
+
+from org_budget import budget_frontier
+from org_chart import LAYOUT_ENGINES, chart_dot, choose_engine, render_chart_svg
+from org_model import (
+    LISTING_COLUMNS, ROLES, cached_org, pay_config, pay_config_error, pay_structure, pay_structure_files,
+)
+from org_pay import PayStructure
+from org_sweep import cost_cube
+from org_telemetry import telemetry_log
+from org_timing import StageTimer, profile_summary, save_profile, start_profile
 
 st.set_page_config(page_title="Org Chart", layout="centered")
+
+# Diagnostics switches are read up front so the whole rerun can be timed and profiled
+diagnostics = st.session_state.get("diagnostics", False)
+profiler = start_profile() if diagnostics and st.session_state.get("profile_rerun", False) else None
+timer = StageTimer()
+
 st.title("Restructure Chart")
 
-# --- Salary Spine Data (rounded to nearest £200 after 30% uplift) ---
-df_salaries = {
-    13: 32100, 14: 32800, 15: 33600, 16: 34400, 17: 35200, 18: 36000, 19: 36800, 20: 37800,
-    21: 38600, 22: 39600, 23: 41200, 24: 42400, 25: 43600, 26: 44400, 27: 45600, 28: 47000,
-    29: 48400, 30: 49800, 31: 51200, 32: 52600, 33: 54200, 34: 55800, 35: 57400, 36: 59000,
-    37: 60800, 38: 62600, 39: 64400, 40: 66400, 41: 68400, 42: 70400, 43: 72600, 44: 74600,
-    45: 77000, 46: 79400, 47: 81800, 48: 84200, 49: 86800, 50: 89400, 51: 92000, 52: 94600,
-    53: 97400, 54: 100400, 55: 103400, 56: 106400, 57: 109600
-}
-
-SPINE_RANGES = {
-    2: list(range(13, 19)),
-    3: list(range(20, 28)),
-    4: list(range(27, 40)),
-    5: list(range(36, 45)),
-    6: list(range(45, 58))
-}
-
-def get_salary(level, seniority_pct):
-    if level not in SPINE_RANGES:
-        return 0, 0
-    spine_range = SPINE_RANGES[level]
-    index = int(round((seniority_pct / 100) * (len(spine_range) - 1)))
-    spine_point = spine_range[index]
-    return df_salaries.get(spine_point, 0), spine_point
+
+@st.cache_resource(max_entries=16, hash_funcs={PayStructure: lambda pay: pay.key})
+def load_cost_cube(pay):
+    # Every slider combination, costed once per pay structure per server process
+    return cost_cube(pay)
+
+
+# Money stays numeric so the listing sorts by value; the browser formats it
+LISTING_COLUMN_CONFIG = {"cost": st.column_config.NumberColumn("cost", format="£%,d")}
+LISTING_PAGE_SIZES = (25, 50, 100, 250)
+
+
+def attach_telemetry(timer, params, headcount):
+    """Send every stage ``timer`` times to the latency log (see the report page) under one new run id."""
+    if (log := telemetry_log()) is not None:
+        timer.attach(partial(log.record, uuid.uuid4().hex, params, headcount))
+    return timer
+
+
+def panel_timer(timer, panel, params, headcount):
+    """``timer`` on the panel's run within a full rerun.
+
+    A fragment-only rerun (a change to the panel's own widgets) replays the
+    panel with the full rerun's arguments, so it gets a fresh timer and run
+    id rather than adding its stages to a rerun that has already finished.
+    """
+    if timer.claim(panel):
+        return timer
+    return attach_telemetry(StageTimer(), params, headcount)
+
+
+def budget_strip(costs, budget):
+    """Row of cells under a slider, green where the cost fits the budget."""
+    cells = "".join(
+        f"<div style='flex:1; height:4px; background:{'#2e7d32' if cost <= budget else '#c62828'};'></div>"
+        for cost in costs
+    )
+    return f"<div style='display:flex; gap:1px; margin-top:-1rem;'>{cells}</div>"
+
 
 # --- Sliders and UI Controls ---
 staff_scale_input = st.slider("% of current staffing level", 32, 100, 100, format="%d%%")
-staff_scale = (staff_scale_input - 29) * (100 / (100 - 29))
-
+staff_scale_strip = st.empty()
 seniority_input = st.slider("Seniority afforded", 70, 100, 100, format="%d%%")  # default changed to 100%
-seniority = (seniority_input - 76) * (100 / (100 - 76))
-
+seniority_strip = st.empty()
 workers_per_mgr = st.slider("Learning technologists per manager", 5, 10, 10)
 show_content_as_team = st.checkbox("Learning content as separate team", value=False)
-
-chart_container = st.container()
-
-# --- Team Counts ---
-fss_num_staff = int(5 + (15 * staff_scale / 100))
-system_num_staff = int(3 + (7 * staff_scale / 100))
-content_num_staff = min(3, int(1 + (4 * staff_scale / 100)))
-total_fss_workers = fss_num_staff + (0 if show_content_as_team else content_num_staff)
-fss_num_managers = max(1, round(total_fss_workers / workers_per_mgr))
-
-# --- Org Chart ---
-dot = graphviz.Digraph(engine="circo")
-dot.graph_attr.update(fontsize="6")
-dot.node_attr.update(fontsize="6")
-dot.edge_attr.update(fontsize="6")
-dot.attr(ranksep="1.5", nodesep="1.0")
-salary, spine = get_salary(6, seniority)
-director_penwidth = 0.25 + 3.75 * ((spine - 13) / (57 - 13))
-dot.node("Boss", f"""Director
-Level 6-{spine:02}""", shape="hexagon", penwidth=str(director_penwidth))
-
-# --- Staffing Table Generation ---
-staff_rows = []
-
-staff_rows.append({"Role": "Director", "Level": 6, "Spine Point": spine, "Salary": salary, "Team": "0_Director"})
-
-# FSS Managers as individual nodes
-fss_mgr_nodes = []
-for i in range(fss_num_managers):
-    mgr_id = f"FSS_Manager_{i+1}"
-    salary, spine = get_salary(5, seniority)
-    penwidth = 0.25 + 3.75 * ((spine - 17) / (53 - 17))
-    dot.node(mgr_id, f"""FSS manager
-Level 5-{spine:02}""", shape="box", style="rounded", color="blue", penwidth=str(penwidth))
-    dot.edge("Boss", mgr_id, color="blue", penwidth="2")
-    salary, spine = get_salary(5, seniority)
-    staff_rows.append({"Role": "FSS manager", "Level": 5, "Spine Point": spine, "Salary": salary, "Team": "1_FSS"})
-    fss_mgr_nodes.append(mgr_id)
-
-# Systems team
-salary, spine = get_salary(5, seniority)
-penwidth = 0.25 + 3.75 * ((spine - 17) / (53 - 17))
-dot.node("Sys_Manager", f"""Systems manager
-Level 5-{spine:02}""", shape="box", style="rounded", color="red", penwidth=str(penwidth))
-dot.edge("Boss", "Sys_Manager", color="red", penwidth="2")
-salary, spine = get_salary(5, seniority)
-staff_rows.append({"Role": "Systems manager", "Level": 5, "Spine Point": spine, "Salary": salary, "Team": "2_Systems"})
-
-# Content team manager (if shown separately)
-if show_content_as_team:
-    salary, spine = get_salary(5, seniority)
-    penwidth = 0.25 + 3.75 * ((spine - 17) / (53 - 17))
-    dot.node("Content_Manager", f"""Content manager
-Level 5-{spine:02}""", shape="box", style="rounded", color="green", penwidth=str(penwidth))
-    dot.edge("Boss", "Content_Manager", color="green", penwidth="2")
-    salary, spine = get_salary(5, seniority)
-    staff_rows.append({"Role": "Content manager", "Level": 5, "Spine Point": spine, "Salary": salary, "Team": "3_Content"})
-
-# --- Worker allocation helper ---
-def calc_worker_allocation(seniority_pct):
-    low_mix = {4: 0.25, 3: 0.5, 2: 0.25}
-    high_mix = {4: 1.0, 3: 0.0, 2: 0.0}
-    mix = {}
-    for level in [4, 3, 2]:
-        mix[level] = (seniority_pct / 100) * high_mix[level] + ((100 - seniority_pct) / 100) * low_mix[level]
-    return [(level, proportion) for level, proportion in mix.items() if proportion > 0.01]
-
-allocations = calc_worker_allocation(seniority)
-
-# --- Create and assign workers ---
-merged_content_workers = []
-worker_counter = 0
-
-def create_workers(team, count, parent_nodes):
-    global worker_counter
-    local_workers = []
-    assigned = 0
-    level_counts = []
-
-    # Precompute exact worker counts per level using proportions
-    for level, proportion in allocations:
-        exact = count * proportion
-        level_counts.append((level, exact))
-
-    # Sort by descending exact so larger buckets are filled first
-    level_counts.sort(key=lambda x: -x[1])
-
-    for level, exact in level_counts:
-        n = min(int(round(exact)), count - assigned)
-        for _ in range(n):
-            parent = next(parent_nodes)
-            salary, spine = get_salary(level, seniority)
-            role = f"{team}_Worker_{worker_counter}"
-            worker_counter += 1
-            is_merged_content = (
-                not show_content_as_team and team == "3_Content"
-            )
-            team_label = "Content" if is_merged_content else team.split('_')[1]
-            role_label = f"{team_label} worker"
-            color_map = {"FSS": "blue", "Systems": "red", "Content": "green"}
-            color = color_map.get(team_label, "black")
-            penwidth = 0.25 + 3.75 * ((spine - 13) / (57 - 13))
-            if is_merged_content:
-                merged_content_workers.append((role, color, level, spine, role_label))
-            else:
-                dot.node(role, f"""{role_label}
-Level {level}-{spine:02}""", color=color, penwidth=str(penwidth))
-            if not is_merged_content:
-                dot.edge(parent, role, color=color, style="dashed")
-            staff_rows.append({"Role": role_label, "Level": level, "Spine Point": spine, "Salary": salary, "Team": team})
-            local_workers.append(role)
-            assigned += 1
-            if assigned >= count:
-                break
-
-    return local_workers
-
-# --- Create Workers ---
-
-# Round-robin distribution to FSS managers
-fss_mgr_cycle = itertools.cycle(fss_mgr_nodes)
-create_workers("1_FSS", fss_num_staff, fss_mgr_cycle)
-
-# Systems workers
-create_workers("2_Systems", system_num_staff, itertools.cycle(["Sys_Manager"]))
-
-# Content workers: integrate with FSS or show separately
-if show_content_as_team:
-    create_workers("3_Content", content_num_staff, itertools.cycle(["Content_Manager"]))
-else:
-    create_workers("3_Content", content_num_staff, itertools.cycle([fss_mgr_nodes[0]]))
-
-# Inject merged content worker edges together in a cluster
-if not show_content_as_team and merged_content_workers:
-    with dot.subgraph(name="cluster_merged_content") as c:
-        c.attr(label="Merged Content Workers")
-        c.attr(style="dashed")
-        for role, color, level, spine, role_label in merged_content_workers:
-            penwidth = 0.25 + 3.75 * ((spine - 13) / (57 - 13))
-            c.node(role, f"""{role_label}
-Level {level}-{spine:02}""", color=color, penwidth=str(penwidth))
-            c.edge(fss_mgr_nodes[0], role, color=color, style="dashed")
+structure_files = pay_structure_files()
+structure_path = None
+if len(structure_files) > 1:
+    structure_path = st.selectbox("Pay structure", structure_files, format_func=lambda path: path.stem)
+config = pay_config(structure_path)
+if (error := pay_config_error(structure_path)) is not None:
+    st.warning(f"Pay structure file could not be reloaded, so the last good version is in use: {error}")
+if issues := pay_structure(path=structure_path).issues:
+    # Overlaps and gaps are allowed (the live structure has both) but worth knowing about
+    with st.expander(f"Pay structure: {len(issues)} range issue{'s' * (len(issues) != 1)}"):
+        st.markdown("\n".join(f"- {issue}" for issue in issues))
+uplift_pct = st.number_input("Pay uplift on base spine (%)", min_value=0.0, max_value=100.0, value=config.uplift_pct, step=0.5,
+                             help=f"Salaries are rounded to the nearest £{config.rounding}")
+budget = st.number_input("Budget (£)", min_value=0, value=0, step=50000, help="Shades the sliders by what fits; 0 turns it off")
+
+params = (staff_scale_input, seniority_input, workers_per_mgr, show_content_as_team)
+with timer.stage("cost_lookup"):
+    pay = pay_structure(uplift_pct, path=structure_path)
+    cube = load_cost_cube(pay)
+    total_cost = cube.cost(*params)
+    team_costs = cube.team_costs(*params)
+headcount = int(cube.headcount[cube.index(*params)])
+attach_telemetry(timer, params, headcount)
+if budget:
+    staff_scale_strip.markdown(budget_strip(cube.cost_along(0, *params), budget), unsafe_allow_html=True)
+    seniority_strip.markdown(budget_strip(cube.cost_along(1, *params), budget), unsafe_allow_html=True)
+
+# --- Headline: straight from the cost cube, before any post exists ---
+st.markdown(f"<p style='font-size:0.9em; font-weight:600;'>Total Estimated Cost: £{total_cost:,.0f}</p>", unsafe_allow_html=True)
+st.caption(" · ".join(f"{team.split('_')[1]} £{cost:,.0f}" for team, cost in team_costs.items() if cost))
+
+# --- Budget frontier: the most each slider can take with the others held ---
+if budget:
+    with timer.stage("budget_frontier"):
+        frontier = budget_frontier(budget, workers_per_mgr, show_content_as_team, cost=cube.cost)
+    max_scale = frontier.max_staff_scale[seniority_input]
+    max_seniority = frontier.max_seniority[staff_scale_input]
+    scale_note = "no staffing level fits" if max_scale is None else f"staffing up to {max_scale}%"
+    seniority_note = "no seniority fits" if max_seniority is None else f"seniority up to {max_seniority}%"
+    st.caption(f"Within £{budget:,.0f}: {scale_note} at this seniority · {seniority_note} at this staffing")
+    with st.expander("Budget frontier"):
+        st.line_chart({"seniority": list(frontier.max_staff_scale),
+                       "max staffing %": list(frontier.max_staff_scale.values())},
+                      x="seniority", y="max staffing %")
+
+# Model stages, timed one by one (each is still a cache hit when unchanged)
+cached_org(*params, pay=pay, timer=timer)
+
+
+# The chart and the listing are parallel fragments: on a slider change they
+# run alongside each other once the headline is out, and their own widgets
+# rerun only their own panel. With diagnostics on they run inline instead,
+# so their stages are timed (and profiled) within this rerun.
 
 # --- Chart Output ---
-total_cost = sum(row["Salary"] for row in staff_rows)
-with chart_container:
-    st.markdown(f"<p style='font-size:0.9em; font-weight:600;'>Total Estimated Cost: £{total_cost:,.0f}</p>", unsafe_allow_html=True)
-    st.graphviz_chart(dot)
+@st.fragment(parallel=not diagnostics)
+def chart_panel(params, pay, timer, headcount):
+    timer = panel_timer(timer, "chart", params, headcount)
+    engine_choice = st.selectbox("Chart layout", ("auto",) + LAYOUT_ENGINES, help="auto picks an engine from the chart's size")
+    model = cached_org(*params, pay=pay)
+    with timer.stage("dot"):
+        chart = chart_dot(*params, pay=pay)
+    engine = choose_engine(chart.nodes, chart.edges) if engine_choice == "auto" else engine_choice
+    with timer.stage("layout"):
+        svg = render_chart_svg(model, chart, engine)
+    if svg is not None:
+        st.image(svg)
+    else:
+        # No graphviz binaries on this host: fall back to in-browser layout
+        import graphviz
+
+        st.graphviz_chart(graphviz.Source(chart.source, engine=engine))
 
-# --- Staff Listing Table ---
-for row in staff_rows:
-    row["Salary"] = f"£{row['Salary']:,.0f}"
 
-if staff_rows:
+# --- Staff Listing Table ---
+@st.fragment(parallel=not diagnostics)
+def listing_panel(params, pay, timer, headcount):
+    timer = panel_timer(timer, "listing", params, headcount)
+    # Filtered, sorted and paged on the server: only the visible page is sent
+    with timer.stage("table_store"):
+        store = cached_org(*params, pay=pay).store
+    if not len(store):
+        return
     st.markdown("<p style='font-size:0.9em; font-weight:600;'>Full Staff Listing</p>", unsafe_allow_html=True)
-    df_table = pd.DataFrame([{
-        "role name": row["Role"],
-        "team": row["Team"],
-        "level": row["Level"],
-        "spline": row["Spine Point"],
-        "cost": row["Salary"]
-    } for row in staff_rows])
-
-    df_table.sort_values(by=["team", "role name", "level", "spline"], inplace=True)
-    df_table.drop(columns=["team"], inplace=True)
-    st.dataframe(df_table, hide_index=True)
+    role_col, sort_col, size_col = st.columns([3, 2, 1])
+    present = set(store.role.tolist())
+    roles = role_col.multiselect("Roles", [role for i, role in enumerate(ROLES) if i in present], placeholder="All roles")
+    sort_by = sort_col.selectbox("Sort by", (None,) + tuple(LISTING_COLUMNS), format_func=lambda key: key or "team")
+    page_size = size_col.selectbox("Rows", LISTING_PAGE_SIZES)
+    descending = sort_col.toggle("Descending", disabled=sort_by is None)
+
+    with timer.stage("table_view"):
+        rows = store.listing_rows(roles=roles or None, sort_by=sort_by, descending=descending)
+    pages = max(1, -(-len(rows) // page_size))
+    page = st.number_input("Page", min_value=1, max_value=pages, value=1) if pages > 1 else 1
+    start = (page - 1) * page_size
+    visible = rows[start:start + page_size]
+    with timer.stage("table_page"):
+        frame = store.frame(visible).drop(columns=["team"])
+    st.dataframe(frame, hide_index=True, column_config=LISTING_COLUMN_CONFIG)
+    st.caption(f"Rows {start + 1:,}–{start + len(visible):,} of {len(rows):,}" if len(rows) else "No matching posts")
+
+
+chart_panel(params, pay, timer, headcount)
+listing_panel(params, pay, timer, headcount)
+
+# --- Diagnostics ---
+with st.expander("Diagnostics"):
+    st.toggle("Time each stage", key="diagnostics",
+              help="Runs the chart and listing inline so this rerun's timings cover every stage")
+    if diagnostics:
+        st.toggle("Profile each rerun with cProfile", key="profile_rerun")
+        st.dataframe(timer.rows(), hide_index=True,
+                     column_config={"ms": st.column_config.NumberColumn("ms", format="%.2f")})
+    if profiler is not None:
+        profile_path = save_profile(profiler)
+        st.caption(f"Profile saved to {profile_path}")
+        st.code(profile_summary(profile_path), language=None)
+        with open(profile_path, "rb") as f:
+            st.download_button("Download .pstats", f.read(), file_name=os.path.basename(profile_path))
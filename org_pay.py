@@ -0,0 +1,199 @@
+"""Pay structure compiled into flat arrays.
+
+``PayStructure`` keeps the salary spine as one contiguous array and each
+level's spine range as an (offset, length) pair into it, so a salary
+lookup is index arithmetic rather than building lists and probing dicts.
+
+Structures are described in TOML files (see ``pay_structures/``) which
+``PayStructureFile`` parses once and re-reads only when the file changes.
+"""
+import math
+import os
+import threading
+import tomllib
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True, eq=False)
+class PayConfig:
+    """Raw contents of a pay structure file; ``version`` changes on every reload."""
+    path: str
+    version: int
+    base_spine: dict
+    level_ranges: dict
+    uplift_pct: float
+    rounding: int
+
+
+def load_pay_config(path, version=0):
+    with open(path, "rb") as f:
+        data = tomllib.load(f)
+    try:
+        base_spine = {int(point): int(salary) for point, salary in data["spine"].items()}
+        level_ranges = {int(level): range(first, last + 1) for level, (first, last) in data["levels"].items()}
+        uplift_pct = float(data.get("uplift_pct", 0))
+        rounding = int(data.get("rounding", 1))
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"{path}: malformed pay structure ({e!r})") from e
+    # Compile the uplifted spine once so a broken structure is rejected at load time
+    try:
+        PayStructure(uplift_spine(base_spine, uplift_pct, rounding), level_ranges)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from e
+    return PayConfig(str(path), version, base_spine, level_ranges, uplift_pct, rounding)
+
+
+class PayStructureFile:
+    """A pay structure file parsed once and reloaded only when its mtime changes.
+
+    If a reload fails (for example a half-saved edit, or the file briefly
+    missing mid-save) the last good config keeps being served; the error is
+    kept in ``error``.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.error = None
+        self._mtime = None
+        self._config = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError as e:
+            # Briefly missing, as during an editor's rename-on-save
+            with self._lock:
+                if self._config is None:
+                    raise
+                self.error = e
+                self._mtime = None  # re-read whatever file comes back
+            return self._config
+        if mtime == self._mtime:
+            return self._config
+        with self._lock:
+            if mtime != self._mtime:
+                try:
+                    self._config = load_pay_config(self.path, version=mtime)
+                    self.error = None
+                except (OSError, ValueError) as e:
+                    if self._config is None:
+                        raise
+                    self.error = e
+                self._mtime = mtime
+        return self._config
+
+
+def uplift_spine(base_spine, uplift_pct, rounding):
+    """Base spine after a ``uplift_pct``% award, rounded to the nearest ``rounding``."""
+    if not math.isfinite(uplift_pct) or uplift_pct <= -100:
+        raise ValueError(f"pay uplift must be a finite percentage above -100, not {uplift_pct}")
+    if rounding < 1:
+        raise ValueError(f"rounding must be at least 1, not {rounding}")
+    points = sorted(base_spine)
+    base = np.array([base_spine[p] for p in points], dtype=float)
+    derived = np.rint(base * (1 + uplift_pct / 100) / rounding) * rounding
+    return dict(zip(points, derived.astype(np.int64).tolist()))
+
+
+class PayStructure:
+    """Salary spine plus the spine range each level may be paid on.
+
+    Structural problems (missing or non-consecutive spine points, ranges
+    running off the spine) raise ``ValueError``. Overlapping ranges and
+    spine points no level uses are allowed, because the live structure has
+    both, but they are listed in ``issues``. Pass ``strict=True`` to treat
+    them as errors as well.
+
+    ``key`` is an optional hashable identity used by caches outside this module.
+    """
+
+    def __init__(self, spine, level_ranges, strict=False, key=None):
+        self.key = key
+        points = sorted(spine)
+        if not points:
+            raise ValueError("pay spine is empty")
+        if points != list(range(points[0], points[-1] + 1)):
+            raise ValueError("pay spine points must be consecutive")
+        self.first_point = points[0]
+        self.last_point = points[-1]
+        self.spine = np.array([spine[p] for p in points], dtype=np.int64)
+        self._spine = self.spine.tolist()
+
+        self.levels = tuple(sorted(level_ranges))
+        self._ranges = {}
+        for level in self.levels:
+            spine_range = list(level_ranges[level])
+            if not spine_range:
+                raise ValueError(f"level {level} has an empty spine range")
+            if spine_range != list(range(spine_range[0], spine_range[0] + len(spine_range))):
+                raise ValueError(f"level {level} spine range is not consecutive")
+            if spine_range[0] < self.first_point or spine_range[-1] > self.last_point:
+                raise ValueError(f"level {level} spine range {spine_range[0]}-{spine_range[-1]} runs off the spine")
+            self._ranges[level] = (spine_range[0] - self.first_point, len(spine_range))
+
+        # Per-level offset/length arrays, indexed by level number (-1 = no such level)
+        self._slot = np.full(max(self.levels) + 1, -1, dtype=np.int64)
+        self._slot[list(self.levels)] = np.arange(len(self.levels))
+        self.offsets = np.array([self._ranges[level][0] for level in self.levels], dtype=np.int64)
+        self.lengths = np.array([self._ranges[level][1] for level in self.levels], dtype=np.int64)
+
+        self.issues = self._find_issues()
+        if strict and self.issues:
+            raise ValueError("; ".join(self.issues))
+
+    def spine_range(self, level):
+        offset, length = self._ranges[level]
+        return range(self.first_point + offset, self.first_point + offset + length)
+
+    def overlaps(self):
+        """(level, level, shared spine points) for every pair of overlapping ranges."""
+        found = []
+        for i, a in enumerate(self.levels):
+            for b in self.levels[i + 1:]:
+                shared = range(max(self.spine_range(a).start, self.spine_range(b).start),
+                               min(self.spine_range(a).stop, self.spine_range(b).stop))
+                if shared:
+                    found.append((a, b, shared))
+        return found
+
+    def gaps(self):
+        """Spine points between the lowest and highest range that no level uses."""
+        used = set()
+        for level in self.levels:
+            used.update(self.spine_range(level))
+        return [p for p in range(min(used), max(used) + 1) if p not in used]
+
+    def _find_issues(self):
+        issues = [f"levels {a} and {b} share spine point {shared.start}" if len(shared) == 1 else
+                  f"levels {a} and {b} share spine points {shared.start}-{shared.stop - 1}"
+                  for a, b, shared in self.overlaps()]
+        issues.extend(f"spine point {p} is not in any level" for p in self.gaps())
+        return issues
+
+    def salary(self, level, pct):
+        """(salary, spine point) for one post; (0, 0) for an unknown level.
+
+        ``pct`` picks a point along the level's range and is clamped to 0-100.
+        """
+        if level not in self._ranges:
+            return 0, 0
+        offset, length = self._ranges[level]
+        index = min(max(int(round((pct / 100) * (length - 1))), 0), length - 1)
+        return self._spine[offset + index], self.first_point + offset + index
+
+    def salaries(self, levels, pct):
+        """Vectorized ``salary`` over broadcastable arrays of levels and percentages."""
+        levels = np.asarray(levels, dtype=np.int64)
+        pct = np.asarray(pct, dtype=float)
+        known = (levels >= 0) & (levels < len(self._slot))
+        slot = np.where(known, self._slot[np.where(known, levels, 0)], -1)
+        known = slot >= 0
+        slot = np.where(known, slot, 0)
+        length = self.lengths[slot]
+        index = np.clip(np.rint((pct / 100) * (length - 1)), 0, length - 1).astype(np.int64)
+        offset = self.offsets[slot] + index
+        return (np.where(known, self.spine[offset], 0),
+                np.where(known, offset + self.first_point, 0))
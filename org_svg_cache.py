@@ -0,0 +1,72 @@
+"""On-disk cache of rendered chart SVGs, shared by every process on the host.
+
+Entries are files named after the DOT content hash, so any Streamlit worker
+that lays out a chart saves the others from doing it again. Writes go via
+a temp file and ``os.replace`` so readers never see a partial SVG, and the
+directory is trimmed back to ``max_bytes`` by evicting the least recently
+used files (reads bump a file's mtime).
+"""
+import os
+import tempfile
+
+SVG_CACHE_DIR = os.environ.get("ORG_SVG_CACHE_DIR", os.path.join(tempfile.gettempdir(), "org_chart_svg"))
+SVG_CACHE_MAX_BYTES = int(os.environ.get("ORG_SVG_CACHE_MB", 200)) * 1024 * 1024
+
+
+class SvgDiskCache:
+    def __init__(self, directory=SVG_CACHE_DIR, max_bytes=SVG_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.svg")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                svg = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted by another process after we read it
+            pass
+        return svg
+
+    def put(self, key, svg):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(svg)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in ``max_bytes``."""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(".svg"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
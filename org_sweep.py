@@ -0,0 +1,151 @@
+"""Vectorized sweep of the model over every discrete slider combination.
+
+``sweep()`` evaluates the same rules as ``org_model.build_org`` but on
+batched NumPy arrays, so the whole slider space (~25k scenarios) is costed
+in one pass instead of one script rerun per combination.
+"""
+import math
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from org_model import (
+    SENIORITY_RANGE, STAFF_SCALE_RANGE, TEAMS, WORKER_LEVELS, WORKERS_PER_MGR_RANGE,
+    min_senior_share, optimal_mix, pay_structure, seniority_from_input, staff_scale_from_input,
+)
+
+LEVELS = (2, 3, 4, 5, 6)
+
+
+@dataclass(frozen=True)
+class Sweep:
+    """Results indexed by (staff scale, seniority, workers per manager, content team).
+
+    ``team_cost`` has a trailing axis over ``TEAMS`` and ``level_headcount``
+    a trailing axis over ``LEVELS``.
+    """
+    staff_scale_inputs: np.ndarray
+    seniority_inputs: np.ndarray
+    workers_per_mgr: np.ndarray
+    show_content_as_team: np.ndarray
+    team_cost: np.ndarray
+    level_headcount: np.ndarray
+    managers: np.ndarray
+
+    @property
+    def shape(self):
+        return self.managers.shape
+
+    @property
+    def total_cost(self):
+        return self.team_cost.sum(axis=-1)
+
+    @property
+    def headcount(self):
+        return self.level_headcount.sum(axis=-1)
+
+    def index(self, staff_scale_input, seniority_input, workers_per_mgr, show_content_as_team):
+        """Array index of one slider combination."""
+        return (
+            int(staff_scale_input - self.staff_scale_inputs[0]),
+            int(seniority_input - self.seniority_inputs[0]),
+            int(workers_per_mgr - self.workers_per_mgr[0]),
+            int(bool(show_content_as_team)),
+        )
+
+    def cost(self, *params):
+        """Total cost of one slider combination."""
+        return int(self.team_cost[self.index(*params)].sum())
+
+    def team_costs(self, *params):
+        return dict(zip(TEAMS, self.team_cost[self.index(*params)].tolist()))
+
+    def cost_along(self, axis, *params):
+        """Total cost as one slider moves with the others held at ``params``."""
+        index = list(self.index(*params))
+        index[axis] = slice(None)
+        return self.team_cost[tuple(index)].sum(axis=-1)
+
+
+def worker_level_counts(count, worker_salaries, senior_share, workers_per_mgr):
+    """Workers per level (in ``WORKER_LEVELS`` order): shape (count, seniority, span, 3).
+
+    ``org_model.grade_mix`` for every combination. Team sizes are small and
+    repeat across the staff scale axis, so each distinct (size, seniority,
+    span) is optimized once and the result scattered back.
+    """
+    count = np.asarray(count)
+    sizes, inverse = np.unique(count, return_inverse=True)
+    out = np.empty((len(sizes), len(worker_salaries), len(workers_per_mgr), len(WORKER_LEVELS)), dtype=np.int64)
+    for n, (salaries, share) in enumerate(zip(worker_salaries.tolist(), senior_share.tolist())):
+        for i, size in enumerate(sizes.tolist()):
+            min_senior = math.ceil(size * share - 1e-9)
+            for w, span in enumerate(workers_per_mgr.tolist()):
+                out[i, n, w] = optimal_mix(size, tuple(salaries), min_senior, max(1, span))
+    return out[inverse.reshape(-1)]
+
+
+def sweep(staff_scale_inputs=None, seniority_inputs=None, workers_per_mgr=None, pay=None):
+    """Cost every combination of the given slider values (default: all of them)."""
+    pay = pay or pay_structure()
+    if staff_scale_inputs is None:
+        staff_scale_inputs = np.arange(STAFF_SCALE_RANGE[0], STAFF_SCALE_RANGE[1] + 1)
+    if seniority_inputs is None:
+        seniority_inputs = np.arange(SENIORITY_RANGE[0], SENIORITY_RANGE[1] + 1)
+    if workers_per_mgr is None:
+        workers_per_mgr = np.arange(WORKERS_PER_MGR_RANGE[0], WORKERS_PER_MGR_RANGE[1] + 1)
+    staff_scale_inputs = np.asarray(staff_scale_inputs)
+    seniority_inputs = np.asarray(seniority_inputs)
+    workers_per_mgr = np.asarray(workers_per_mgr)
+    show_content = np.array([False, True])
+
+    # --- Team Counts: (S,) and (S, W, C) ---
+    staff_scale = staff_scale_from_input(staff_scale_inputs.astype(float))
+    fss_num_staff = (5 + (15 * staff_scale / 100)).astype(np.int64)
+    system_num_staff = (3 + (7 * staff_scale / 100)).astype(np.int64)
+    content_num_staff = np.minimum(3, (1 + (4 * staff_scale / 100)).astype(np.int64))
+    total_fss_workers = fss_num_staff[:, None] + np.where(show_content, 0, content_num_staff[:, None])
+    fss_num_managers = np.maximum(
+        1, np.rint(total_fss_workers[:, None, :] / workers_per_mgr[None, :, None])).astype(np.int64)
+
+    # --- Salaries per seniority: (N, len(LEVELS)) ---
+    seniority = seniority_from_input(seniority_inputs.astype(float))
+    salaries, _ = pay.salaries(np.array(LEVELS)[None, :], seniority[:, None])
+    worker_salaries = salaries[:, [LEVELS.index(level) for level in WORKER_LEVELS]]
+    manager_salary = salaries[:, LEVELS.index(5)][None, :, None, None]
+
+    # --- Workers per level: (S, N, W, 3), independent of the content toggle ---
+    senior_share = np.array([min_senior_share(pct) for pct in seniority.tolist()])
+    team_workers = [worker_level_counts(n, worker_salaries, senior_share, workers_per_mgr)
+                    for n in (fss_num_staff, system_num_staff, content_num_staff)]
+    worker_cost = [(w * worker_salaries[None, :, None]).sum(axis=-1)[..., None] for w in team_workers]
+
+    shape = (len(staff_scale_inputs), len(seniority_inputs), len(workers_per_mgr), 2)
+    fss_managers = np.broadcast_to(fss_num_managers[:, None, :, :], shape)
+    content_managers = np.broadcast_to(show_content.astype(np.int64), shape)
+
+    team_cost = np.empty(shape + (len(TEAMS),), dtype=np.int64)
+    team_cost[..., 0] = salaries[:, LEVELS.index(6)][None, :, None, None]
+    team_cost[..., 1] = fss_managers * manager_salary + worker_cost[0]
+    team_cost[..., 2] = manager_salary + worker_cost[1]
+    team_cost[..., 3] = content_managers * manager_salary + worker_cost[2]
+
+    level_headcount = np.zeros(shape + (len(LEVELS),), dtype=np.int64)
+    workers = sum(team_workers)
+    for i, level in enumerate(WORKER_LEVELS):
+        level_headcount[..., LEVELS.index(level)] = workers[..., i, None]
+    managers = fss_managers + 1 + content_managers
+    level_headcount[..., LEVELS.index(5)] = managers
+    level_headcount[..., LEVELS.index(6)] = 1
+
+    return Sweep(staff_scale_inputs, seniority_inputs, workers_per_mgr, show_content,
+                 team_cost, level_headcount, managers)
+
+
+def cost_cube(pay=None):
+    """Full-space sweep stored compactly, for lookups from the app."""
+    result = sweep(pay=pay)
+    return replace(result,
+                   team_cost=result.team_cost.astype(np.int32),
+                   level_headcount=result.level_headcount.astype(np.int16),
+                   managers=result.managers.astype(np.int16))
@@ -0,0 +1,153 @@
+"""Rerun latency telemetry kept in a local SQLite file.
+
+Every stage the app times is appended as one row (rerun id, slider
+values, headcount, stage, seconds) by a background writer thread, so
+logging never holds up a rerun. The table is trimmed to the newest
+``TELEMETRY_MAX_ROWS`` rows. ``latency_percentiles`` and
+``slow_regions`` turn the log into the p50/p95/p99 tables shown on the
+report page.
+"""
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import closing
+from functools import lru_cache
+
+TELEMETRY_DB = os.environ.get("ORG_TELEMETRY_DB", os.path.join(tempfile.gettempdir(), "org_telemetry.sqlite"))
+TELEMETRY_ENABLED = os.environ.get("ORG_TELEMETRY", "1") != "0"
+TELEMETRY_MAX_ROWS = int(os.environ.get("ORG_TELEMETRY_MAX_ROWS", 500_000))
+# Rows waiting for the writer thread; more than this and new rows are dropped
+TELEMETRY_QUEUE_SIZE = 10_000
+# Headcounts are grouped into bands this wide in the report
+SIZE_BAND = 10
+STAFF_SCALE_BAND = 10
+PERCENTILES = (0.5, 0.95, 0.99)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stage_timings (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    run_id TEXT NOT NULL,
+    staff_scale INTEGER,
+    seniority INTEGER,
+    workers_per_mgr INTEGER,
+    content_team INTEGER,
+    headcount INTEGER,
+    stage TEXT NOT NULL,
+    seconds REAL NOT NULL
+)
+"""
+
+
+def _connect(path):
+    connection = sqlite3.connect(path, timeout=10)
+    try:
+        connection.execute(_SCHEMA)
+    except sqlite3.Error:
+        connection.close()
+        raise
+    return connection
+
+
+class TelemetryLog:
+    """Appends stage timings to ``path`` from a daemon thread, in batches.
+
+    If the database cannot be opened the reason is kept in ``error`` and
+    later rows are dropped.
+    """
+
+    def __init__(self, path=TELEMETRY_DB, max_rows=TELEMETRY_MAX_ROWS):
+        self.path = path
+        self.max_rows = max_rows
+        self.error = None
+        self._queue = queue.Queue(maxsize=TELEMETRY_QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._write_loop, name="org-telemetry", daemon=True)
+        self._thread.start()
+
+    def record(self, run_id, params, headcount, stage, seconds):
+        """Queue one row; dropped if the writer has given up or fallen far behind."""
+        if self.error is not None:
+            return
+        staff_scale, seniority, workers_per_mgr, content_team = params
+        try:
+            self._queue.put_nowait((time.time(), run_id, int(staff_scale), int(seniority), int(workers_per_mgr),
+                                    int(bool(content_team)), int(headcount), stage, seconds))
+        except queue.Full:
+            pass
+
+    def _write_loop(self):
+        try:
+            connection = _connect(self.path)
+        except sqlite3.Error as e:
+            # No database to write to: stop logging rather than queue forever
+            self.error = e
+            return
+        written = 0
+        while True:
+            rows = [self._queue.get()]
+            while True:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with connection:
+                    connection.executemany(
+                        "INSERT INTO stage_timings (ts, run_id, staff_scale, seniority, workers_per_mgr,"
+                        " content_team, headcount, stage, seconds) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                written += len(rows)
+                # Trim now and then rather than on every batch
+                if written >= 1000:
+                    written = 0
+                    with connection:
+                        connection.execute("DELETE FROM stage_timings WHERE id <= "
+                                            "(SELECT MAX(id) FROM stage_timings) - ?", (self.max_rows,))
+            except sqlite3.Error:
+                # Telemetry is best effort; a locked or unwritable file only loses these rows
+                pass
+
+
+@lru_cache(maxsize=None)
+def telemetry_log():
+    """Process-wide log, or None when ``ORG_TELEMETRY=0``."""
+    return TelemetryLog() if TELEMETRY_ENABLED else None
+
+
+def load_timings(path=TELEMETRY_DB, since=None):
+    """Logged rows as a DataFrame, optionally only those newer than ``since`` (epoch seconds)."""
+    import pandas as pd
+
+    with closing(_connect(path)) as connection:
+        return pd.read_sql_query("SELECT * FROM stage_timings WHERE ts >= ?", connection, params=(since or 0,))
+
+
+def latency_percentiles(timings, by=("stage",)):
+    """p50/p95/p99 in milliseconds and the number of distinct reruns for each group of ``by`` columns."""
+    grouped = timings.groupby(list(by), observed=True)
+    table = grouped["seconds"].quantile(list(PERCENTILES)).unstack() * 1e3
+    table.columns = [f"p{round(p * 100)} ms" for p in PERCENTILES]
+    table["runs"] = grouped["run_id"].nunique()
+    return table.reset_index()
+
+
+def with_bands(timings):
+    """Adds ``size_band`` and ``staff_scale_band``: the lower bound of each row's band."""
+    return timings.assign(size_band=timings["headcount"] // SIZE_BAND * SIZE_BAND,
+                          staff_scale_band=timings["staff_scale"] // STAFF_SCALE_BAND * STAFF_SCALE_BAND)
+
+
+def slow_regions(timings, limit=10):
+    """Slider regions by p95 of whole-rerun time (sum of its stages), slowest first.
+
+    A stage logged twice under one run id counts once (its latest time).
+    """
+    timings = timings.sort_values("ts").drop_duplicates(["run_id", "stage"], keep="last")
+    runs = (with_bands(timings)
+            .groupby(["run_id", "staff_scale_band", "content_team"], observed=True)["seconds"].sum()
+            .reset_index())
+    table = latency_percentiles(runs, by=("staff_scale_band", "content_team"))
+    table["content_team"] = table["content_team"].astype(bool)
+    return table.sort_values("p95 ms", ascending=False).head(limit)
@@ -0,0 +1,90 @@
+"""Stage timings and optional cProfile capture for one rerun of the app.
+
+The app times each stage of a rerun with a ``StageTimer`` and shows the
+result in its diagnostics panel. With profiling switched on the whole
+rerun also runs under cProfile and the stats are saved to ``PROFILE_DIR``
+for ``python -m pstats`` or snakeviz.
+"""
+import cProfile
+import io
+import os
+import pstats
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+PROFILE_DIR = os.environ.get("ORG_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "org_profiles"))
+
+
+class StageTimer:
+    """Wall-clock seconds per named stage, in the order stages first ran.
+
+    Safe to share between the script thread and parallel fragments. A
+    stage that runs again replaces its old time.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self._sink = None
+        self._claimed = set()
+        self._lock = threading.Lock()
+
+    def claim(self, name):
+        """True the first time ``name`` is claimed on this timer, False ever after.
+
+        A fragment rerun alone is handed the timer of the full rerun that
+        first drew it; claiming tells it to time itself on a fresh one.
+        """
+        with self._lock:
+            if name in self._claimed:
+                return False
+            self._claimed.add(name)
+            return True
+
+    def attach(self, sink):
+        """Call ``sink(name, seconds)`` for every stage timed so far and from now on."""
+        with self._lock:
+            self._sink = sink
+            done = list(self.stages.items())
+        for name, seconds in done:
+            sink(name, seconds)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.stages[name] = elapsed
+                sink = self._sink
+            if sink is not None:
+                sink(name, elapsed)
+
+    def rows(self):
+        with self._lock:
+            return [{"stage": name, "ms": seconds * 1e3} for name, seconds in self.stages.items()]
+
+
+def start_profile():
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def save_profile(profiler, directory=PROFILE_DIR):
+    """Stop ``profiler`` and write its stats to a new .pstats file; returns the path."""
+    profiler.disable()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, time.strftime("rerun-%Y%m%d-%H%M%S-") + f"{os.getpid()}-{threading.get_ident()}.pstats")
+    profiler.dump_stats(path)
+    return path
+
+
+def profile_summary(path, limit=15):
+    """Top ``limit`` functions by cumulative time, as pstats prints them."""
+    out = io.StringIO()
+    pstats.Stats(path, stream=out).strip_dirs().sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
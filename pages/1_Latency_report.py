@@ -0,0 +1,32 @@
+import time
+
+import streamlit as st
+
+from org_telemetry import TELEMETRY_DB, latency_percentiles, load_timings, slow_regions, with_bands
+
+st.set_page_config(page_title="Latency report", layout="centered")
+st.title("Rerun Latency")
+
+window = st.selectbox("Period", ("Last hour", "Last day", "Last week", "Everything"), index=1)
+since = {"Last hour": 3600, "Last day": 86400, "Last week": 7 * 86400}.get(window)
+timings = load_timings(since=time.time() - since if since else None)
+if timings.empty:
+    st.info(f"No reruns logged yet in {TELEMETRY_DB}")
+    st.stop()
+
+timings = with_bands(timings)
+st.caption(f"{timings['run_id'].nunique():,} reruns · {len(timings):,} stage timings")
+
+ms = st.column_config.NumberColumn(format="%.1f")
+ms_columns = {column: ms for column in ("p50 ms", "p95 ms", "p99 ms")}
+
+st.markdown("<p style='font-size:0.9em; font-weight:600;'>Per stage</p>", unsafe_allow_html=True)
+st.dataframe(latency_percentiles(timings), hide_index=True, column_config=ms_columns)
+
+st.markdown("<p style='font-size:0.9em; font-weight:600;'>Per stage and org size</p>", unsafe_allow_html=True)
+stage = st.selectbox("Stage", sorted(timings["stage"].unique()))
+by_size = latency_percentiles(timings[timings["stage"] == stage], by=("size_band",))
+st.dataframe(by_size, hide_index=True, column_config=ms_columns)
+
+st.markdown("<p style='font-size:0.9em; font-weight:600;'>Slowest slider regions (whole rerun)</p>", unsafe_allow_html=True)
+st.dataframe(slow_regions(timings), hide_index=True, column_config=ms_columns)
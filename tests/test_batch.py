@@ -0,0 +1,30 @@
+"""Batch scenarios are validated up front, with errors that name the scenario."""
+import pytest
+
+from org_batch import DEFAULTS, normalize_scenario
+
+
+def test_defaults_and_coercion():
+    scenario = normalize_scenario({"name": "a", "staff_scale": "50", "content_team": "yes", "uplift_pct": "2.5"})
+    assert scenario == dict(DEFAULTS, name="a", staff_scale=50, content_team=True, uplift_pct=2.5)
+
+
+@pytest.mark.parametrize("raw, message", [
+    ({"workers_per_mgr": 0}, "workers_per_mgr must be at least 1"),
+    ({"staff_scale": 500}, "staff_scale 500 is outside"),
+    ({"seniority": 10}, "seniority 10 is outside"),
+    ({"staff_scale": [1, 2]}, "scenario 3 (bad): "),
+    ({"uplift_pct": {"x": 1}}, "scenario 3 (bad): "),
+    ({"uplift_pct": "nan"}, "uplift_pct must be finite"),
+    ({"content_team": "maybe"}, "not a yes/no value"),
+    ({"span": 5}, "unknown scenario keys: span"),
+])
+def test_bad_scenarios_name_the_row(raw, message):
+    with pytest.raises(ValueError, match="^scenario 3 \\(bad\\): ") as error:
+        normalize_scenario(dict(raw, name="bad"), number=3)
+    assert message in str(error.value)
+
+
+def test_bad_type_without_number_is_a_value_error():
+    with pytest.raises(ValueError):
+        normalize_scenario({"staff_scale": [1, 2]})
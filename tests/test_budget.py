@@ -0,0 +1,37 @@
+"""The bisected budget frontier must agree with a scan of the cost cube."""
+from org_budget import budget_frontier
+from org_model import SENIORITY_RANGE, STAFF_SCALE_RANGE
+from org_sweep import sweep
+
+
+def _scan_max(values, fits):
+    found = [value for value in values if fits(value)]
+    return max(found) if found else None
+
+
+def test_frontier_matches_scan():
+    result = sweep()
+    staff_scales = range(STAFF_SCALE_RANGE[0], STAFF_SCALE_RANGE[1] + 1)
+    seniorities = range(SENIORITY_RANGE[0], SENIORITY_RANGE[1] + 1)
+    for workers_per_mgr in (5, 10):
+        for show_content_as_team in (False, True):
+            _, _, span, content = result.index(STAFF_SCALE_RANGE[0], SENIORITY_RANGE[0], workers_per_mgr,
+                                               show_content_as_team)
+            costs = result.total_cost[:, :, span, content]
+            for budget in (0, int(costs.min()), int(costs.mean()), int(costs.max()), int(costs.max()) + 1):
+                frontier = budget_frontier(budget, workers_per_mgr, show_content_as_team, cost=result.cost)
+                for seniority in seniorities:
+                    assert frontier.max_staff_scale[seniority] == _scan_max(
+                        staff_scales, lambda s: result.cost(s, seniority, workers_per_mgr,
+                                                            show_content_as_team) <= budget)
+                for staff_scale in staff_scales:
+                    assert frontier.max_seniority[staff_scale] == _scan_max(
+                        seniorities, lambda n: result.cost(staff_scale, n, workers_per_mgr,
+                                                           show_content_as_team) <= budget)
+
+
+def test_cost_is_monotone():
+    # Bisection relies on cost never falling as staff scale or seniority rises
+    costs = sweep().total_cost
+    assert (costs[1:] >= costs[:-1]).all()
+    assert (costs[:, 1:] >= costs[:, :-1]).all()
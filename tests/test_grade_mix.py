@@ -0,0 +1,28 @@
+"""optimal_mix must find the cheapest feasible mix, whatever order salaries fall in."""
+import itertools
+import random
+
+from org_model import optimal_mix
+
+
+def brute_force(count, salaries, min_senior, span):
+    costs = [
+        sum(n * salary for n, salary in zip(mix, salaries))
+        for mix in itertools.product(range(count + 1), repeat=len(salaries))
+        if sum(mix) == count and mix[0] >= min_senior
+        and all(lower <= upper * span for upper, lower in zip(mix, mix[1:]))
+    ]
+    return min(costs)
+
+
+def test_optimal_mix_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(1500):
+        count = rng.randint(0, 30)
+        salaries = tuple(rng.randint(1, 60) for _ in range(3))
+        min_senior = rng.randint(0, count)
+        span = rng.randint(1, 6)
+        mix = optimal_mix(count, salaries, min_senior, span)
+        assert sum(mix) == count and mix[0] >= min_senior
+        assert all(lower <= upper * span for upper, lower in zip(mix, mix[1:]))
+        assert sum(n * salary for n, salary in zip(mix, salaries)) == brute_force(count, salaries, min_senior, span)
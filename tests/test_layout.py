@@ -0,0 +1,51 @@
+"""compose_layouts must shift every piece of a json0 layout consistently."""
+import re
+
+from org_layout import compose_layouts
+
+# Trimmed json0 output of: digraph { subgraph cluster_t { label="FSS"; A; B } A -> B [color=blue] C }
+TEAM = {
+    "name": "%1", "directed": True, "strict": False, "bb": "0,0,134,149.25", "_subgraph_cnt": 1,
+    "objects": [
+        {"name": "cluster_t", "bb": "0,0,70,149.25", "label": "FSS", "lp": "35,136.62", "_gvid": 0,
+         "nodes": [1, 2], "edges": [0]},
+        {"_gvid": 1, "name": "A", "label": "\\N", "pos": "35,98", "width": "0.75"},
+        {"_gvid": 2, "name": "B", "label": "\\N", "pos": "35,26", "width": "0.75"},
+        {"_gvid": 3, "name": "C", "label": "\\N", "pos": "107,98", "width": "0.75"},
+    ],
+    "edges": [{"_gvid": 0, "tail": 1, "head": 2, "color": "blue",
+               "pos": "e,35,44.104 35,79.697 35,72.407 35,63.726 35,55.536"}],
+}
+SMALL = {"name": "%2", "bb": "0,0,54,36", "objects": [{"_gvid": 0, "name": "D", "pos": "27,18"}], "edges": []}
+TOP = {"name": "%3", "bb": "0,0,54,36", "objects": [{"_gvid": 0, "name": "Boss", "pos": "27,18"}], "edges": []}
+
+
+def _positions(dot):
+    return dict(re.findall(r'^\t"?(\w+)"? \[pos="([^"]+)"', dot, re.M))
+
+
+def test_compose_layouts():
+    dot = compose_layouts(TOP, [SMALL, TEAM], ["\tBoss -> D", "\tBoss -> A"], gap=72)
+
+    # Row: 54 + 72 + 134 wide, 149.25 high; the Director sits 72 above it
+    assert 'graph [bb="0,0,260.00,257.25"' in dot
+    # Pieces are top-aligned: the short piece moves up, the tall one right by 54 + 72
+    assert _positions(dot) == {
+        "D": "27.00,131.25",
+        "A": "161.00,98.00", "B": "161.00,26.00", "C": "233.00,98.00",
+        "Boss": "130.00,239.25",
+    }
+    # Clusters are renamed per piece and their box and label move with it
+    cluster = re.search(r"subgraph (\w+) \{\n\t\tgraph \[([^\]]*)\]\n\t\t\"A\"\n\t\t\"B\"\n\t\}", dot)
+    assert cluster.group(1) == "cluster_piece1_0"
+    assert 'bb="126.00,0.00,196.00,149.25"' in cluster.group(2)
+    assert 'lp="161.00,136.62"' in cluster.group(2)
+    assert 'label="FSS"' in cluster.group(2)
+    # Edge splines keep their arrow point marker and shift point by point
+    edge = re.search(r'^\t"A" -> "B" \[(.*)\]$', dot, re.M).group(1)
+    assert 'pos="e,161.00,44.10 161.00,79.70 161.00,72.41 161.00,63.73 161.00,55.54"' in edge
+    assert 'color="blue"' in edge
+    # Attributes graphviz writes escaped pass through untouched
+    assert 'label="\\N"' in dot
+    # Joining edges are appended unpositioned for the renderer to route
+    assert dot.endswith("\tBoss -> D\n\tBoss -> A\n}\n")
@@ -0,0 +1,37 @@
+"""The server-side listing must order rows exactly as sorting the table in pandas would."""
+import itertools
+
+import pytest
+
+from org_model import LISTING_COLUMNS, cached_org
+
+SCENARIOS = list(itertools.product((32, 70, 100), (70, 100), (5, 10), (False, True)))
+
+
+def _plain(frame):
+    # Compare on the displayed strings, not the categorical codes behind them
+    return frame.astype({"role name": str, "team": str}).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("params", SCENARIOS)
+def test_listing_order_matches_sort_values(params):
+    store = cached_org(*params).store
+    expected = _plain(store.frame()).sort_values(["team", "role name", "level", "spline"], kind="stable")
+    assert _plain(store.frame(store.listing_order)).equals(expected.reset_index(drop=True))
+
+
+@pytest.mark.parametrize("params", SCENARIOS)
+def test_listing_rows_match_stable_sort(params):
+    store = cached_org(*params).store
+    listing = _plain(store.frame(store.listing_order))
+    for column, descending in itertools.product(LISTING_COLUMNS, (False, True)):
+        expected = listing.sort_values(column, ascending=not descending, kind="stable").reset_index(drop=True)
+        rows = store.listing_rows(sort_by=column, descending=descending)
+        assert _plain(store.frame(rows)).equals(expected), (column, descending)
+
+
+def test_listing_rows_filter_roles():
+    store = cached_org(100, 100, 10, True).store
+    rows = store.listing_rows(roles=["Systems worker", "Director"], sort_by="role name")
+    assert set(store.frame(rows)["role name"].astype(str)) == {"Systems worker", "Director"}
+    assert list(store.frame(rows)["role name"].astype(str))[0] == "Director"
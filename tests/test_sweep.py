@@ -0,0 +1,29 @@
+"""The vectorized sweep must cost every scenario exactly as build_org does."""
+import itertools
+from collections import Counter
+
+from org_model import (
+    SENIORITY_RANGE, STAFF_SCALE_RANGE, TEAMS, WORKERS_PER_MGR_RANGE, build_org,
+)
+from org_sweep import LEVELS, sweep
+
+
+def test_sweep_matches_build_org():
+    result = sweep()
+    grid = itertools.product(
+        range(STAFF_SCALE_RANGE[0], STAFF_SCALE_RANGE[1] + 1, 3),
+        range(SENIORITY_RANGE[0], SENIORITY_RANGE[1] + 1, 2),
+        range(WORKERS_PER_MGR_RANGE[0], WORKERS_PER_MGR_RANGE[1] + 1),
+        (False, True),
+    )
+    for params in grid:
+        model = build_org(*params)
+        team_cost, level_headcount = Counter(), Counter()
+        for post in model.posts:
+            team_cost[post.team] += post.salary
+            level_headcount[post.level] += 1
+        index = result.index(*params)
+        assert result.team_cost[index].tolist() == [team_cost[team] for team in TEAMS], params
+        assert result.level_headcount[index].tolist() == [level_headcount[level] for level in LEVELS], params
+        assert result.managers[index] == level_headcount[5], params
+        assert result.total_cost[index] == model.total_cost, params